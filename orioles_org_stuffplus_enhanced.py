@@ -8,9 +8,10 @@ import requests
 from bs4 import BeautifulSoup
 from pybaseball import playerid_lookup, statcast_pitcher
 import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 
+from otv_plus_export import export_download_button, export_format_picker
+
 # ----------------------
 # Pitch Scoring Functions
 # ----------------------
@@ -194,11 +195,12 @@ def run_dashboard():
 
     if view == "Team View":
         st.header("🧢 Orioles Org Leaderboard")
+        export_format = export_format_picker("team_export_format")
         if st.button("Fetch & Score All Pitchers"):
             org = get_org_pitchers()
             team_df = rate_all_pitchers(org, ba_grades, str(start_date), str(end_date))
             st.dataframe(team_df.sort_values("StuffPlus", ascending=False), use_container_width=True)
-            st.download_button("📥 Export CSV", team_df.to_csv(index=False), "orioles_team_stuffplus.csv")
+            export_download_button("📥 Export", team_df, "orioles_team_stuffplus", export_format, key="team_export")
 
 if __name__ == "__main__":
     run_dashboard()
@@ -6,9 +6,11 @@ import pandas as pd
 import numpy as np
 from pybaseball import playerid_lookup, statcast_pitcher
 import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 
+from otv_plus_export import export_download_button, export_format_picker
+from otv_plus_plots import show_pitch_score_dist
+
 # ----------------------
 # Scoring Functions
 # ----------------------
@@ -118,13 +120,7 @@ def rate_prospect(last, first, ba_grades, start_date, end_date):
 # Visualization Functions
 # ----------------------
 
-def plot_pitch_score_dist(df):
-    fig, ax = plt.subplots()
-    sns.violinplot(data=df, x='pitch_name', y='WeightedScore_Standardized', ax=ax)
-    ax.set_title("Standardized Stuff+ Scores by Pitch Type (Orioles Model)")
-    ax.set_xlabel("Pitch Type")
-    ax.set_ylabel("Stuff+ Score")
-    return fig
+PITCH_DIST_TITLE = "Standardized Stuff+ Scores by Pitch Type (Orioles Model)"
 
 def plot_weighted_score_trend(df):
     df['game_date'] = pd.to_datetime(df['game_date'])
@@ -190,19 +186,21 @@ def run_dashboard():
 
         start_date = st.date_input("Start Date", value=pd.to_datetime("2024-04-01"))
         end_date = st.date_input("End Date", value=pd.to_datetime("2024-07-01"))
+        interactive = st.checkbox("Interactive charts", value=False)
+        export_format = export_format_picker("player_export_format")
         submitted = st.form_submit_button("Run Model")
 
     if submitted and first_name1 and last_name1:
         df1 = rate_prospect(last_name1, first_name1, ba_grades, str(start_date), str(end_date))
         st.subheader(f"🎯 {first_name1} {last_name1} Standardized Stuff+ Scores")
-        st.pyplot(plot_pitch_score_dist(df1))
+        show_pitch_score_dist(df1, 'WeightedScore_Standardized', PITCH_DIST_TITLE, interactive=interactive)
         st.pyplot(plot_weighted_score_trend(df1))
-        st.download_button("📥 Download CSV", df1.to_csv(index=False), file_name=f"{first_name1}_{last_name1}_standardized_scores.csv")
+        export_download_button("📥 Download", df1, f"{first_name1}_{last_name1}_standardized_scores", export_format, key="player_export")
 
         if first_name2 and last_name2:
             df2 = rate_prospect(last_name2, first_name2, ba_grades, str(start_date), str(end_date))
             st.subheader(f"🎯 {first_name2} {last_name2} Standardized Stuff+ Scores")
-            st.pyplot(plot_pitch_score_dist(df2))
+            show_pitch_score_dist(df2, 'WeightedScore_Standardized', PITCH_DIST_TITLE, interactive=interactive)
             st.pyplot(plot_weighted_score_trend(df2))
             st.subheader("🔍 Player Comparison")
             st.pyplot(compare_players(df1, df2, f"{first_name1} {last_name1}", f"{first_name2} {last_name2}"))
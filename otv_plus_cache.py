@@ -0,0 +1,284 @@
+# OTV+ Score Cache
+# Description: Content-addressed memoization of pitch scoring outputs, keyed by input data and scoring-rule fingerprints
+
+import hashlib
+import inspect
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from otv_plus_dashboard_complete import (
+    pitch_score,
+    score_changeup,
+    score_curve,
+    score_cutter,
+    score_fastball,
+    score_pitches,
+    score_sinker,
+    score_slider,
+    score_splitter,
+    score_sweeper,
+    standardize_scores,
+)
+from otv_plus_features import (
+    TRAJECTORY_COLUMNS,
+    add_pitch_features,
+    fastball_separation,
+    movement_features,
+    spin_efficiency,
+)
+
+# Bump when scoring changes in a way the function sources do not capture
+MODEL_VERSION = "otv-2"
+
+# Which rule and derived-feature functions each pitch type's score depends on
+SCORING_RULES = {
+    '4-Seam Fastball': (score_fastball, [movement_features, spin_efficiency]),
+    'Slider': (score_slider, [movement_features]),
+    'Curveball': (score_curve, [movement_features]),
+    'Knuckle Curve': (score_curve, [movement_features]),
+    'Changeup': (score_changeup, [fastball_separation]),
+    'Sinker': (score_sinker, [movement_features, fastball_separation]),
+    'Cutter': (score_cutter, [movement_features, fastball_separation]),
+    'Sweeper': (score_sweeper, [movement_features, fastball_separation]),
+    'Split-Finger': (score_splitter, [fastball_separation]),
+}
+
+# Feature columns are hashed too, so stored features that change invalidate entries
+FEATURE_INPUTS = ['IVB', 'Hmove', 'ivb_in', 'hb_arm', 'velo_diff', 'v_sep', 'spin_efficiency']
+INPUT_COLUMNS = ['pitcher', 'pitch_name', 'p_throws', 'pfx_x', 'pfx_z', 'release_speed', 'spin_axis'] + TRAJECTORY_COLUMNS + FEATURE_INPUTS
+SCORED_COLUMNS = ['IVB', 'Hmove', 'v_sep', 'Score', 'BA_Grade']
+# Everything apply_scoring_mode adds; only these (plus overall) are cached per result
+MODE_COLUMNS = ['UsageWeight', 'WeightedScore', 'WeightedScore_Standardized']
+
+# "usage": usage-weighted + standardized, overall = sum (OTV+ complete / org enhanced)
+# "standardized": graded + standardized, overall = mean (standardized dashboard)
+# "weighted": graded only, overall = mean (original dashboard)
+SCORING_MODES = ("usage", "standardized", "weighted")
+
+# ----------------------
+# Fingerprints
+# ----------------------
+
+def _sha(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+def function_fingerprint(func):
+    try:
+        return _sha(inspect.getsource(func))
+    except (OSError, TypeError):
+        code = func.__code__
+        return _sha(code.co_code, code.co_consts)
+
+def data_fingerprint(df, columns=INPUT_COLUMNS):
+    frame = df.reindex(columns=columns)
+    return _sha(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+
+def rule_fingerprint(pitch_type, ba_grades):
+    """Fingerprint everything a single pitch type's score depends on."""
+    scorer, features = SCORING_RULES.get(pitch_type, (pitch_score, []))
+    return _sha(
+        MODEL_VERSION,
+        pitch_type,
+        function_fingerprint(pitch_score),
+        function_fingerprint(score_pitches),
+        function_fingerprint(scorer),
+        *[function_fingerprint(f) for f in features],
+        ba_grades.get(pitch_type, 50),
+    )
+
+# ----------------------
+# Cache Store
+# ----------------------
+
+def _nbytes(value):
+    """Approximate memory held by a cached value (arrays, possibly inside tuples)."""
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 64
+
+class ScoreCache:
+    """In-memory LRU with an optional on-disk pickle store behind it.
+
+    Both are bounded in bytes: the LRU drops least recently used entries and
+    the disk store deletes least recently used files. Values are scoring
+    outputs only (float arrays), never full pitch frames. Safe to share
+    between dashboard sessions; every access holds a lock.
+    """
+
+    def __init__(self, directory=None, max_bytes=64 * 2**20, max_disk_bytes=512 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _disk_entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+        if self.directory and os.path.exists(self._path(key)):
+            try:
+                value = pd.read_pickle(self._path(key))
+            except Exception:
+                # A truncated or foreign file is a miss; the next put rewrites it
+                value = None
+            if value is not None:
+                # Refresh the file's age so pruning drops cold entries first
+                os.utime(self._path(key))
+                self._remember(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self.directory:
+                self._write(key, value)
+        return value
+
+    def _write(self, key, value):
+        path = self._path(key)
+        old = os.path.getsize(path) if os.path.exists(path) else 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            pd.to_pickle(value, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self._disk_bytes += os.path.getsize(path) - old
+        if self._disk_bytes > self.max_disk_bytes:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        # Down to 3/4 of the cap so pruning does not rescan on every put
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_disk_bytes * 3 // 4:
+                break
+            os.remove(path)
+            total -= size
+        self._disk_bytes = total
+
+    def _remember(self, key, value):
+        if key in self._items:
+            self._bytes -= _nbytes(self._items[key])
+        self._items[key] = value
+        self._items.move_to_end(key)
+        self._bytes += _nbytes(value)
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, dropped = self._items.popitem(last=False)
+            self._bytes -= _nbytes(dropped)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            if self.directory:
+                for path, _, _ in self._disk_entries():
+                    os.remove(path)
+                self._disk_bytes = 0
+
+# ----------------------
+# Cached Scoring
+# ----------------------
+
+def score_pitches_cached(df, ba_grades, cache):
+    """``score_pitches`` memoized per pitch type.
+
+    Each pitch type is keyed on its own rows and rules, so editing one
+    scorer only re-scores the pitches that use it.
+    """
+    # Features first, over the whole frame: changeup separation needs the fastballs
+    df = add_pitch_features(df.reset_index(drop=True))
+    scored = pd.DataFrame(index=df.index, columns=SCORED_COLUMNS, dtype=float)
+    groups = df.groupby('pitch_name', dropna=False, sort=False).indices
+    for pitch_type, positions in groups.items():
+        rows = df.iloc[positions]
+        key = _sha("pitch", data_fingerprint(rows), rule_fingerprint(pitch_type, ba_grades))
+        part = cache.get(key)
+        if part is None:
+            part = cache.put(key, score_pitches(rows.copy(), ba_grades)[SCORED_COLUMNS].to_numpy(dtype=float))
+        scored.iloc[positions] = part
+    return df.assign(**{col: scored[col].astype(float) for col in SCORED_COLUMNS})
+
+def apply_scoring_mode(df, mode="usage"):
+    if mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode: {mode}")
+    if mode == "usage":
+        usage = df['pitch_name'].value_counts(normalize=True).to_dict()
+        df['UsageWeight'] = df['pitch_name'].map(usage)
+        df['WeightedScore'] = df['Score'] * (df['BA_Grade'] / 60) * df['UsageWeight']
+    else:
+        df['WeightedScore'] = df['Score'] * (df['BA_Grade'] / 60)
+    if mode == "weighted":
+        return df, df['WeightedScore'].mean()
+    df = standardize_scores(df, "WeightedScore")
+    if mode == "usage":
+        return df, df['WeightedScore_Standardized'].sum()
+    return df, df['WeightedScore_Standardized'].mean()
+
+def result_key(df, ba_grades, mode):
+    types = sorted(df['pitch_name'].drop_duplicates().tolist(), key=str)
+    return _sha(
+        "result",
+        mode,
+        data_fingerprint(df),
+        function_fingerprint(standardize_scores),
+        *[rule_fingerprint(t, ba_grades) for t in types],
+    )
+
+def score_cached(df, ba_grades, cache, mode="usage"):
+    """Return ``(scored_df, overall)`` for ``df``, reusing any cached work.
+
+    Only the scoring outputs are cached; a hit attaches them to the
+    caller's own frame.
+    """
+    key = result_key(df, ba_grades, mode)
+    hit = cache.get(key)
+    if hit is not None:
+        columns, values, overall = hit
+        df = add_pitch_features(df.reset_index(drop=True))
+        return df.assign(**{col: values[:, i] for i, col in enumerate(columns)}), overall
+    scored = score_pitches_cached(df, ba_grades, cache)
+    scored, overall = apply_scoring_mode(scored, mode)
+    columns = [c for c in SCORED_COLUMNS + MODE_COLUMNS if c in scored]
+    cache.put(key, (columns, scored[columns].to_numpy(dtype=float), overall))
+    return scored, overall
@@ -0,0 +1,282 @@
+# OTV+ Chunked League Scoring
+# Description: Out-of-core Stuff+ scoring for multi-season league pulls that do not fit in memory
+
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from pybaseball import statcast
+
+from otv_plus_dashboard_complete import BA_GRADES, LEAGUE_PERCENTILES_PATH, PITCH_MODELS_DIR, score_pitches
+from otv_plus_features import add_pitch_features, fastball_reference, fastball_sums
+from otv_plus_percentiles import PITCHER_KEY, PercentileIndex
+from otv_plus_reclassify import CLUSTER_FEATURES, PitchReclassifier
+
+DEFAULT_CHUNKSIZE = 100_000
+PITCHER_COL = "pitcher"
+# Pitch-type models are fitted on a uniform sample of at most this many
+# pitches per pitcher; pitchers under the cap are fitted on all of them
+FIT_SAMPLE_PITCHES = 2000
+
+# ----------------------
+# Chunk Sources
+# ----------------------
+
+def iter_pitch_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield pitch-level DataFrames of at most ``chunksize`` rows.
+
+    ``source`` is a CSV path, a list of CSV paths (e.g. one per season) or a
+    zero-argument callable returning an iterable of DataFrames. Sources are
+    re-opened on every call: the pipeline makes three passes (four with
+    ``standardize_chunks``), so a callable is called that many times. For a
+    network pull like ``statcast_chunks``, spill it once with
+    ``dump_statcast_chunks`` and pass the CSV instead.
+    """
+    if callable(source):
+        for frame in source():
+            for start in range(0, len(frame), chunksize):
+                yield frame.iloc[start:start + chunksize]
+        return
+    paths = [source] if isinstance(source, (str, os.PathLike)) else list(source)
+    for path in paths:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def statcast_chunks(start_date, end_date, days=7):
+    """Pull league Statcast data one date window at a time."""
+    start = pd.to_datetime(start_date).date()
+    end = pd.to_datetime(end_date).date()
+    while start <= end:
+        stop = min(start + timedelta(days=days - 1), end)
+        frame = statcast(str(start), str(stop))
+        if frame is not None and not frame.empty:
+            yield frame
+        start = stop + timedelta(days=1)
+
+def dump_statcast_chunks(start_date, end_date, path, days=7):
+    """Spill a league pull to a single CSV without holding it in memory."""
+    header = True
+    for frame in statcast_chunks(start_date, end_date, days=days):
+        frame.to_csv(path, mode="w" if header else "a", header=header, index=False)
+        header = False
+    return path
+
+# ----------------------
+# Streaming Aggregates
+# ----------------------
+
+def _combine_moments(parts, keys):
+    # Chan et al. parallel combination of (count, mean, M2) per group
+    total = parts.groupby(keys)["m"].transform("sum")
+    grand = (parts["m"] * parts["mean"]).groupby([parts[k] for k in keys]).transform("sum") / total.where(total > 0)
+    parts = parts.assign(
+        _wm=parts["m"] * parts["mean"].fillna(0),
+        _m2=parts["M2"].fillna(0) + parts["m"] * (parts["mean"].fillna(0) - grand.fillna(0)) ** 2,
+    )
+    out = parts.groupby(keys).agg(m=("m", "sum"), _wm=("_wm", "sum"), M2=("_m2", "sum"))
+    out["mean"] = out["_wm"] / out["m"].where(out["m"] > 0)
+    return out.drop(columns="_wm")
+
+def fit_league_reclassifier(source, chunksize=DEFAULT_CHUNKSIZE, reclassifier=None, max_pitches=FIT_SAMPLE_PITCHES, seed=0):
+    """Stream the source once and fit every pitcher's pitch-type model in one batched pass.
+
+    Each pitcher keeps a uniform random sample of at most ``max_pitches``
+    pitches (the smallest random keys seen so far), so memory is bounded by
+    the roster, not the number of seasons.
+    """
+    rng = np.random.default_rng(seed)
+    columns = [PITCHER_COL, "pitch_name", "p_throws"] + CLUSTER_FEATURES
+    sample = None
+    for chunk in iter_pitch_chunks(source, chunksize):
+        part = chunk.reindex(columns=columns).assign(_key=rng.random(len(chunk)))
+        sample = part if sample is None else pd.concat([sample, part], ignore_index=True)
+        sample = sample.sort_values("_key").groupby(PITCHER_COL).head(max_pitches)
+    reclassifier = reclassifier or PitchReclassifier()
+    if sample is not None:
+        reclassifier.fit(sample.drop(columns="_key"))
+    return reclassifier
+
+def league_fastball_reference(source, chunksize=DEFAULT_CHUNKSIZE, reclassifier=None):
+    """Stream the source once for each pitcher's primary fastball shape.
+
+    Separation features are relative to a pitcher's whole sample, not to the
+    fastballs that happen to share a chunk. Pass the ``reclassifier`` used
+    for scoring so the fastballs are the reclassified ones.
+    """
+    sums = []
+    for chunk in iter_pitch_chunks(source, chunksize):
+        if reclassifier is not None:
+            chunk = reclassifier.reclassify(chunk, fit=False)
+        sums.append(fastball_sums(chunk))
+    return fastball_reference(pd.concat(sums)) if sums else None
+
+def chunk_aggregates(scored):
+    """Per pitcher/pitch-type usage counts and moments of the graded score."""
+    base = scored["Score"] * (scored["BA_Grade"] / 60)
+    frame = pd.DataFrame({
+        PITCHER_COL: scored[PITCHER_COL].values,
+        "pitch_name": scored["pitch_name"].values,
+        "base": base.values,
+    })
+    grouped = frame.groupby([PITCHER_COL, "pitch_name"])["base"]
+    types = pd.DataFrame({
+        "usage": grouped.size(),
+        "m": grouped.count(),
+        "mean": grouped.mean(),
+        "M2": grouped.var(ddof=0) * grouped.count(),
+    })
+    rows = frame.groupby(PITCHER_COL).size().rename("rows")
+    return types, rows
+
+class ChunkedScorer:
+    """Accumulates league aggregates one chunk at a time.
+
+    Memory is bounded by the chunk size plus one row per pitcher/pitch type.
+    With a ``reclassifier`` fitted by ``fit_league_reclassifier`` the results
+    match ``rate_prospect`` run pitcher by pitcher (exactly for pitchers
+    under ``FIT_SAMPLE_PITCHES``).
+    """
+
+    def __init__(self, ba_grades, reference=None, reclassifier=None):
+        self.ba_grades = ba_grades
+        self.reference = reference
+        self.reclassifier = reclassifier
+        self.types = None
+        self.rows = None
+
+    def score(self, chunk):
+        """Reclassify, derive features against the league reference and score one chunk."""
+        chunk = chunk.copy()
+        if self.reclassifier is not None:
+            chunk = self.reclassifier.reclassify(chunk, fit=False)
+        return score_pitches(add_pitch_features(chunk, self.reference), self.ba_grades)
+
+    def update(self, chunk):
+        if chunk.empty:
+            return self
+        return self.update_scored(self.score(chunk))
+
+    def update_scored(self, scored):
+        """Fold in pitches that have already been through ``score``."""
+        if scored.empty:
+            return self
+        types, rows = chunk_aggregates(scored)
+        if self.types is None:
+            self.types, self.rows = types, rows
+            return self
+        merged = pd.concat([self.types, types]).reset_index()
+        usage = merged.groupby([PITCHER_COL, "pitch_name"])["usage"].sum()
+        self.types = _combine_moments(merged, [PITCHER_COL, "pitch_name"]).assign(usage=usage)
+        self.rows = pd.concat([self.rows, rows]).groupby(level=0).sum()
+        return self
+
+    def drop(self, pitchers):
+        """Forget ``pitchers`` so their pitches can be folded in again."""
+        if self.types is not None and len(pitchers):
+            keep = ~self.types.index.get_level_values(PITCHER_COL).isin(list(pitchers))
+            self.types = self.types[keep]
+            self.rows = self.rows[~self.rows.index.isin(list(pitchers))]
+        return self
+
+    def usage_weights(self):
+        usage = self.types["usage"]
+        return usage / usage.groupby(level=PITCHER_COL).transform("sum")
+
+    def pitcher_stats(self):
+        """Per-pitcher mean/std of ``WeightedScore``, graded score per pitch and the overall Stuff+."""
+        if self.types is None:
+            raise ValueError("No Statcast data.")
+        weight = self.usage_weights()
+        weighted = pd.DataFrame({
+            "m": self.types["m"],
+            "mean": self.types["mean"] * weight,
+            "M2": self.types["M2"] * weight ** 2,
+        }).reset_index()
+        stats = _combine_moments(weighted, [PITCHER_COL])
+        stats["Pitches"] = self.rows.reindex(stats.index).fillna(0).astype(int)
+        stats["WeightedMean"] = stats["mean"]
+        stats["WeightedStd"] = np.sqrt(stats["M2"] / (stats["m"] - 1).where(stats["m"] > 1))
+        # Standardized scores are z-scores, so they sum to 100 per scored pitch;
+        # a zero/undefined spread falls back to 100 for every row like standardize_scores
+        valid = (stats["WeightedStd"] > 0) & stats["WeightedStd"].notna()
+        stats["StuffPlus"] = np.where(valid, 100 * stats["m"], 100 * stats["Pitches"]).astype(float)
+        # Same as graded_score: mean graded score over the pitcher's scored pitches
+        scored = self.types["m"].groupby(level=PITCHER_COL).sum()
+        graded = (self.types["m"] * self.types["mean"]).groupby(level=PITCHER_COL).sum()
+        stats["GradedScore"] = (graded / scored.where(scored > 0)).reindex(stats.index)
+        return stats.rename(columns={"m": "ScoredPitches"})[
+            ["Pitches", "ScoredPitches", "WeightedMean", "WeightedStd", "StuffPlus", "GradedScore"]
+        ]
+
+# ----------------------
+# Pipeline Entry Points
+# ----------------------
+
+def league_scorer(source, ba_grades, chunksize=DEFAULT_CHUNKSIZE, reclassifier=None):
+    """Fit pitch-type models (unless given) and the fastball reference in two streaming passes."""
+    reclassifier = reclassifier or fit_league_reclassifier(source, chunksize)
+    reference = league_fastball_reference(source, chunksize, reclassifier)
+    return ChunkedScorer(ba_grades, reference, reclassifier)
+
+def rate_league_chunked(source, ba_grades, chunksize=DEFAULT_CHUNKSIZE, reclassifier=None):
+    """Stream the source and return per-pitcher Stuff+ plus the scorer."""
+    scorer = league_scorer(source, ba_grades, chunksize, reclassifier)
+    for chunk in iter_pitch_chunks(source, chunksize):
+        scorer.update(chunk)
+    return scorer.pitcher_stats().reset_index(), scorer
+
+def standardize_chunks(source, scorer, chunksize=DEFAULT_CHUNKSIZE):
+    """Final pass: yield fully scored, standardized pitch-level chunks."""
+    weights = scorer.usage_weights().rename("UsageWeight")
+    stats = scorer.pitcher_stats()
+    for chunk in iter_pitch_chunks(source, chunksize):
+        if chunk.empty:
+            continue
+        df = scorer.score(chunk)
+        df = df.join(weights, on=[PITCHER_COL, "pitch_name"])
+        df["WeightedScore"] = df["Score"] * (df["BA_Grade"] / 60) * df["UsageWeight"]
+        mean = df[PITCHER_COL].map(stats["WeightedMean"])
+        std = df[PITCHER_COL].map(stats["WeightedStd"])
+        valid = (std > 0) & std.notna()
+        df["WeightedScore_Standardized"] = np.where(valid, 100 + 10 * ((df["WeightedScore"] - mean) / std), 100)
+        yield df
+
+def build_league_percentiles(source, ba_grades, chunksize=DEFAULT_CHUNKSIZE, index=None, reclassifier=None):
+    """Stream league data into a per-pitch-type and per-pitcher percentile index."""
+    index = index or PercentileIndex()
+    scorer = league_scorer(source, ba_grades, chunksize, reclassifier)
+    for chunk in iter_pitch_chunks(source, chunksize):
+        if chunk.empty:
+            continue
+        scored = scorer.score(chunk)
+        scorer.update_scored(scored)
+        index.update(scored["Score"], scored["pitch_name"].astype(str))
+    index.update(scorer.pitcher_stats()["GradedScore"], PITCHER_KEY)
+    return index
+
+# ----------------------
+# League Percentile Batch
+# ----------------------
+
+def refresh_league_percentiles(start_date, end_date, csv_path, path=LEAGUE_PERCENTILES_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """Pull a league window to ``csv_path``, score it and save the dashboard's percentile index.
+
+    Pitch-type models are fitted into the dashboards' model directory, so
+    the Player View and live mode start from league-fitted models.
+    """
+    dump_statcast_chunks(start_date, end_date, csv_path)
+    reclassifier = fit_league_reclassifier(csv_path, chunksize, PitchReclassifier(PITCH_MODELS_DIR))
+    build_league_percentiles(csv_path, BA_GRADES, chunksize, reclassifier=reclassifier).save(path)
+    return path
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the league percentile index the OTV+ dashboard reads.")
+    parser.add_argument("start_date")
+    parser.add_argument("end_date")
+    parser.add_argument("--csv", default="league_statcast.csv", help="where to spill the league pull")
+    parser.add_argument("--out", default=LEAGUE_PERCENTILES_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    print(refresh_league_percentiles(args.start_date, args.end_date, args.csv, args.out, args.chunksize))
@@ -7,11 +7,12 @@ import numpy as np
 import requests
 from bs4 import BeautifulSoup
 from pybaseball import playerid_lookup, statcast_pitcher
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 from datetime import date
 
+from otv_plus_export import export_download_button, export_format_picker
+from otv_plus_plots import show_boxplot, show_histogram
+
 # [Functions are identical to previous version up to team_df]
 
 # Streamlit App with Visuals
@@ -34,30 +35,23 @@ def run_dashboard():
     if view == "Team View":
         st.header("🧢 OTV+ Org Leaderboard")
         skip = st.checkbox("Skip players with no Statcast data", value=False)
+        interactive = st.checkbox("Interactive charts", value=False)
+        export_format = export_format_picker("team_export_format")
         if st.button("Fetch & Score All Pitchers"):
             org = get_org_pitchers()
             team_df = rate_all_pitchers(org, ba_grades, str(start_date), str(end_date), skip_no_data=skip)
             st.dataframe(team_df.sort_values("StuffPlus", ascending=False), use_container_width=True)
 
             # Download
-            st.download_button("📥 Export CSV", team_df.to_csv(index=False), "orioles_team_stuffplus.csv")
+            export_download_button("📥 Export", team_df, "orioles_team_stuffplus", export_format, key="team_export")
 
             # Visual: Distribution Plot
             st.subheader("📊 Stuff+ Score Distribution")
-            fig, ax = plt.subplots()
-            sns.histplot(team_df["StuffPlus"], bins=20, kde=True, ax=ax, color="orange")
-            ax.set_xlabel("Stuff+ Score")
-            ax.set_ylabel("Pitchers")
-            ax.set_title("Distribution of Stuff+ Scores (OTV+)")
-            st.pyplot(fig)
+            show_histogram(team_df, "StuffPlus", "Distribution of Stuff+ Scores (OTV+)", "Stuff+ Score", "Pitchers", interactive=interactive)
 
             # Visual: Boxplot by Level
             st.subheader("📈 Stuff+ by Minor League Level")
-            fig2, ax2 = plt.subplots(figsize=(8, 4))
-            sns.boxplot(data=team_df, x="Level", y="StuffPlus", palette="Oranges", ax=ax2)
-            ax2.set_title("Stuff+ Score by Level")
-            ax2.set_ylabel("Stuff+ Score")
-            st.pyplot(fig2)
+            show_boxplot(team_df, "StuffPlus", "Level", "Stuff+ Score by Level", "Level", "Stuff+ Score", interactive=interactive)
 
 if __name__ == "__main__":
     run_dashboard()
@@ -7,11 +7,32 @@ import numpy as np
 import requests
 from bs4 import BeautifulSoup
 from pybaseball import playerid_lookup, statcast_pitcher
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
 import streamlit as st
 from datetime import date
 
+from otv_plus_bootstrap import DEFAULT_RESAMPLES, bootstrap_graded_score
+from otv_plus_features import FeatureStore, add_pitch_features, fastball_separation, movement_features
+from otv_plus_export import export_download_button, export_format_picker
+from otv_plus_percentiles import PercentileIndex, add_pitch_percentiles, add_pitcher_percentiles
+from otv_plus_plots import show_boxplot, show_histogram
+from otv_plus_reclassify import CLUSTER_FEATURES, PitchReclassifier
+
+LEAGUE_PERCENTILES_PATH = os.environ.get("OTV_LEAGUE_PERCENTILES", "league_percentiles.npz")
+FEATURE_STORE = FeatureStore(os.environ.get("OTV_FEATURE_STORE", "feature_store"))
+PITCH_MODELS_DIR = os.environ.get("OTV_PITCH_MODELS", "pitch_models")
+SCORE_CACHE_DIR = os.environ.get("OTV_SCORE_CACHE")
+
+# Scouting grades the dashboard and the league percentile batch score with
+BA_GRADES = {
+    '4-Seam Fastball': 60,
+    'Slider': 55,
+    'Curveball': 55,
+    'Changeup': 50
+}
+
+PITCH_REPORT_COLUMNS = ['game_date', 'pitch_name', 'release_speed', 'release_spin_rate', 'ivb_in', 'hb_arm', 'Score', 'LeaguePct']
+
 # ----------------------
 # Pitch Scoring Functions
 # ----------------------
@@ -74,18 +95,74 @@ def score_changeup(v_sep, spin):
         score -= 5
     return score
 
+def score_sinker(ivb, hb, velo):
+    score = 0
+    if hb >= 16:
+        score += 10
+    elif hb >= 13:
+        score += 5
+    if ivb <= 8:
+        score += 5
+    if velo >= 95:
+        score += 5
+    elif velo < 90:
+        score -= 5
+    if hb < 10 and ivb > 12:
+        score -= 8
+    return score
+
+def score_cutter(ivb, hb, velo_diff):
+    score = 0
+    if hb <= -4:
+        score += 5
+    if ivb >= 10:
+        score += 5
+    if velo_diff <= 4:
+        score += 5
+    elif velo_diff > 7:
+        score -= 5
+    if hb > 2:
+        score -= 8
+    return score
+
+def score_sweeper(hb, ivb, rpm):
+    score = 0
+    if hb >= 18:
+        score += 10
+    elif hb >= 14:
+        score += 5
+    if rpm and rpm > 2600:
+        score += 5
+    if hb < 10:
+        score -= 8
+    if ivb > 4:
+        score -= 5
+    return score
+
+def score_splitter(v_sep, spin, velo_diff):
+    score = 0
+    if v_sep > 14:
+        score += 10
+    elif v_sep > 11:
+        score += 5
+    if spin < 1300:
+        score += 5
+    if velo_diff < 5:
+        score -= 5
+    if spin > 1800:
+        score -= 5
+    return score
+
 # ----------------------
 # Utility + Model Functions
 # ----------------------
 
 def compute_ivb_hmov(df):
-    df['IVB'] = -df['pfx_z'] * 12
-    df['Hmove'] = df['pfx_x'] * 12
-    return df
+    return movement_features(df)
 
 def estimate_vertical_sep(df):
-    df['v_sep'] = df['release_speed'] * 1.5 - df['pfx_z'] * 12
-    return df
+    # Vertical movement separation (inches) from the pitcher's primary fastball
+    return fastball_separation(df)
 
 def pitch_score(row):
     pt = row['pitch_name']
@@ -93,10 +170,19 @@ def pitch_score(row):
         return score_fastball(row['IVB'], row['Hmove'], row['release_speed'], row.get('spin_efficiency', 0.95))
     elif pt == 'Slider':
         return score_slider(row['Hmove'], row['IVB'], row['release_spin_rate'])
-    elif pt == 'Curveball':
+    elif pt in ('Curveball', 'Knuckle Curve'):
         return score_curve(row['IVB'], row['Hmove'], row['release_spin_rate'])
     elif pt == 'Changeup':
         return score_changeup(row['v_sep'], row['release_spin_rate'])
+    # Newer rules take induced vertical break and arm-side break in inches
+    elif pt == 'Sinker':
+        return score_sinker(row['ivb_in'], row['hb_arm'], row['release_speed'])
+    elif pt == 'Cutter':
+        return score_cutter(row['ivb_in'], row['hb_arm'], row['velo_diff'])
+    elif pt == 'Sweeper':
+        return score_sweeper(-row['hb_arm'], row['ivb_in'], row['release_spin_rate'])
+    elif pt == 'Split-Finger':
+        return score_splitter(row['v_sep'], row['release_spin_rate'], row['velo_diff'])
     else:
         return np.nan
 
@@ -109,22 +195,50 @@ def standardize_scores(df, score_col="WeightedScore"):
         df[f"{score_col}_Standardized"] = 100 + 10 * ((df[score_col] - league_mean) / league_std)
     return df
 
-def rate_prospect(last, first, ba_grades, start_date, end_date):
-    pid = playerid_lookup(last, first).key_mlbam.iloc[0]
+def score_pitches(df, ba_grades):
+    # Reuses precomputed feature columns (e.g. from FEATURE_STORE) when present
+    df = add_pitch_features(df)
+    df['Score'] = df.apply(pitch_score, axis=1)
+    df['BA_Grade'] = df['pitch_name'].map(ba_grades).fillna(50)
+    return df
+
+def fetch_pitches(last, first, start_date, end_date):
+    ids = playerid_lookup(last, first).key_mlbam
+    if ids.empty:
+        raise ValueError(f"No player found for {first} {last}.")
+    pid = ids.iloc[0]
     df = statcast_pitcher(start_date, end_date, pid)
     if df.empty:
         raise ValueError("No Statcast data.")
-    df = compute_ivb_hmov(df)
-    df = estimate_vertical_sep(df)
-    df['Score'] = df.apply(pitch_score, axis=1)
-    df['BA_Grade'] = df['pitch_name'].map(ba_grades).fillna(50)
+    return df
+
+@st.cache_resource
+def load_score_cache(directory=SCORE_CACHE_DIR):
+    # Imported here: otv_plus_cache imports the scoring rules from this module
+    from otv_plus_cache import ScoreCache
+    return ScoreCache(directory)
+
+@st.cache_resource
+def load_reclassifier(directory=PITCH_MODELS_DIR):
+    # One per process so fitted pitch-type models survive reruns; the live
+    # dashboard reads the same directory
+    return PitchReclassifier(directory)
+
+def score_prospect(df, ba_grades):
+    # Usage-weighted, standardized scoring (mode "usage"), memoized on the
+    # pitch data, feature values and rule sources
+    from otv_plus_cache import score_cached
+    return score_cached(FEATURE_STORE.attach(df), ba_grades, load_score_cache(), mode="usage")
 
-    usage = df['pitch_name'].value_counts(normalize=True).to_dict()
-    df['UsageWeight'] = df['pitch_name'].map(usage)
-    df['WeightedScore'] = df['Score'] * (df['BA_Grade'] / 60) * df['UsageWeight']
-    df = standardize_scores(df, "WeightedScore")
-    overall = df['WeightedScore_Standardized'].sum()
-    return df, overall
+def graded_score(df):
+    # Mean Score x BA_Grade/60 over scored pitches (the usage-weighted mean of
+    # each pitch type's mean). Unlike the standardized sum it does not grow
+    # with the number of pitches, so it is the per-pitcher quality measure.
+    return (df['Score'] * (df['BA_Grade'] / 60)).mean()
+
+def rate_prospect(last, first, ba_grades, start_date, end_date):
+    df = fetch_pitches(last, first, start_date, end_date)
+    return score_prospect(load_reclassifier().reclassify(df), ba_grades)
 
 def scouting_fallback_score(grades, usage=None):
     base_scores = {k: (grades[k] - 50) / 5 * 5 for k in grades}
@@ -158,25 +272,57 @@ def get_org_pitchers():
             })
     return pd.DataFrame(pitchers)
 
-def rate_all_pitchers(pitchers_df, ba_grades, start_date, end_date, skip_no_data=False):
-    results = []
+def rate_all_pitchers(pitchers_df, ba_grades, start_date, end_date, skip_no_data=False, n_boot=DEFAULT_RESAMPLES):
+    fetched = []
     for _, row in pitchers_df.iterrows():
         try:
-            df, overall = rate_prospect(row['last'], row['first'], ba_grades, start_date, end_date)
+            fetched.append((row, fetch_pitches(row['last'], row['first'], start_date, end_date)))
+        except:
+            fetched.append((row, None))
+    # Cluster the whole org's pitch mixes in one batched pass
+    reclassifier = load_reclassifier()
+    columns = ['pitcher', 'pitch_name', 'p_throws'] + CLUSTER_FEATURES
+    frames = [df.reindex(columns=columns) for _, df in fetched if df is not None]
+    if frames:
+        reclassifier.fit_missing(pd.concat(frames, ignore_index=True))
+
+    results = []
+    scored = []
+    for row, df in fetched:
+        try:
+            if df is None:
+                raise ValueError("No Statcast data.")
+            df, overall = score_prospect(reclassifier.reclassify(df, fit=False), ba_grades)
+            scored.append(df[['pitch_name', 'Score', 'BA_Grade']].assign(Row=len(results)))
+            grade = graded_score(df)
             source = "Statcast"
         except:
             if skip_no_data:
                 continue
             overall = scouting_fallback_score(ba_grades)
+            grade = np.nan
             source = "Scouting"
         results.append({
             "First": row["first"],
             "Last": row["last"],
             "Level": row["level"],
             "StuffPlus": round(overall, 1),
+            "GradedScore": round(grade, 2),
             "Source": source
         })
-    return pd.DataFrame(results)
+    team_df = pd.DataFrame(results)
+    if scored and n_boot:
+        # One batched bootstrap over every Statcast pitcher's pitches
+        ci = bootstrap_graded_score(pd.concat(scored, ignore_index=True), "Row", n_boot=n_boot)
+        ci = ci.set_index("Row")[["GradedScore_Low", "GradedScore_High"]].round(2)
+        team_df = team_df.join(ci)
+    return team_df
+
+@st.cache_resource
+def load_league_percentiles(path=LEAGUE_PERCENTILES_PATH):
+    if not os.path.exists(path):
+        return None
+    return PercentileIndex.load(path)
 
 # ----------------------
 # Streamlit App with Visuals
@@ -187,44 +333,75 @@ def run_dashboard():
     st.title("🟠 OTV+: Orioles Total Value Plus")
     st.markdown("Custom Stuff+ model for Orioles MLB + MiLB pitchers. Incorporates Statcast data, scouting fallback, and pitch usage weighting.")
 
-    ba_grades = {
-        '4-Seam Fastball': 60,
-        'Slider': 55,
-        'Curveball': 55,
-        'Changeup': 50
-    }
+    ba_grades = dict(BA_GRADES)
 
     view = st.radio("Select View", ["Player View", "Team View"])
     start_date = st.date_input("Start Date", value=date.today().replace(month=1, day=1))
     end_date = st.date_input("End Date", value=date.today())
 
+    if view == "Player View":
+        st.header("🎯 OTV+ Pitcher Report")
+        col1, col2 = st.columns(2)
+        first = col1.text_input("First Name")
+        last = col2.text_input("Last Name")
+        if st.button("Score Pitcher") and first and last:
+            try:
+                df, _ = rate_prospect(last, first, ba_grades, str(start_date), str(end_date))
+            except (ValueError, KeyError, OSError) as e:
+                # OSError covers network failures (requests' exceptions derive from it)
+                st.error(f"Could not score {first} {last}: {e}")
+                return
+            league_index = load_league_percentiles()
+            grade = graded_score(df)
+            if league_index is not None:
+                df = add_pitch_percentiles(df, league_index)
+                pitcher_pct = add_pitcher_percentiles(pd.DataFrame({"GradedScore": [grade]}), league_index)["LeaguePct"].iloc[0]
+            else:
+                df['LeaguePct'] = np.nan
+                pitcher_pct = np.nan
+                st.info("No league percentile index found; LeaguePct is blank. Build one with `python otv_plus_chunked.py START END`.")
+            col1, col2 = st.columns(2)
+            col1.metric("Graded score / pitch", f"{grade:.2f}")
+            col2.metric("League percentile", "—" if pd.isna(pitcher_pct) else f"{pitcher_pct:.0f}")
+
+            st.subheader("Pitch Types")
+            summary = df.groupby('pitch_name').agg(
+                Pitches=('Score', 'size'), AvgScore=('Score', 'mean'), LeaguePct=('LeaguePct', 'median'),
+            ).round(1).sort_values('Pitches', ascending=False)
+            st.dataframe(summary, use_container_width=True)
+            st.subheader("Pitches")
+            st.dataframe(df.reindex(columns=PITCH_REPORT_COLUMNS), use_container_width=True)
+
     if view == "Team View":
         st.header("🧢 OTV+ Org Leaderboard")
         skip = st.checkbox("Skip players with no Statcast data", value=False)
+        interactive = st.checkbox("Interactive charts", value=False)
+        export_format = export_format_picker("team_export_format")
         if st.button("Fetch & Score All Pitchers"):
             org = get_org_pitchers()
             team_df = rate_all_pitchers(org, ba_grades, str(start_date), str(end_date), skip_no_data=skip)
-            st.dataframe(team_df.sort_values("StuffPlus", ascending=False), use_container_width=True)
+            league_index = load_league_percentiles()
+            if league_index is not None:
+                team_df = add_pitcher_percentiles(team_df, league_index)
+            # Ranked by graded score per pitch; StuffPlus grows with pitch count
+            team_df = team_df.sort_values("GradedScore", ascending=False, na_position="last")
+            st.dataframe(team_df, use_container_width=True)
 
             # Download
-            st.download_button("📥 Export CSV", team_df.to_csv(index=False), "orioles_team_stuffplus.csv")
+            export_download_button("📥 Export", team_df, "orioles_team_stuffplus", export_format, key="team_export")
+
+            # Scouting fallback rows carry no graded score
+            if team_df["GradedScore"].isna().all():
+                st.info("No pitchers with Statcast data to plot.")
+                return
 
             # Visual: Distribution Plot
-            st.subheader("📊 Stuff+ Score Distribution")
-            fig, ax = plt.subplots()
-            sns.histplot(team_df["StuffPlus"], bins=20, kde=True, ax=ax, color="orange")
-            ax.set_xlabel("Stuff+ Score")
-            ax.set_ylabel("Pitchers")
-            ax.set_title("Distribution of Stuff+ Scores (OTV+)")
-            st.pyplot(fig)
+            st.subheader("📊 Graded Score Distribution")
+            show_histogram(team_df, "GradedScore", "Distribution of Graded Score per Pitch (OTV+)", "Graded Score / Pitch", "Pitchers", interactive=interactive)
 
             # Visual: Boxplot by Level
-            st.subheader("📈 Stuff+ by Minor League Level")
-            fig2, ax2 = plt.subplots(figsize=(8, 4))
-            sns.boxplot(data=team_df, x="Level", y="StuffPlus", palette="Oranges", ax=ax2)
-            ax2.set_title("Stuff+ Score by Level")
-            ax2.set_ylabel("Stuff+ Score")
-            st.pyplot(fig2)
+            st.subheader("📈 Graded Score by Minor League Level")
+            show_boxplot(team_df, "GradedScore", "Level", "Graded Score per Pitch by Level", "Level", "Graded Score / Pitch", interactive=interactive)
 
 if __name__ == "__main__":
     run_dashboard()
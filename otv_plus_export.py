@@ -0,0 +1,130 @@
+# OTV+ Exports
+# Description: Lazily generated, compressed and chunk-streamed exports for the dashboard and batch jobs
+
+import gzip
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+import zstandard
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "CSV (zstd)": ("csv.zst", "application/zstd"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# ----------------------
+# Chunked Writers
+# ----------------------
+
+def iter_frames(data, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield DataFrames of at most ``chunk_rows`` rows from a frame or an iterable of frames."""
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    for frame in frames:
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows]
+
+def _write_csv(frames, fileobj):
+    header = True
+    for frame in frames:
+        fileobj.write(frame.to_csv(index=False, header=header).encode())
+        header = False
+
+def _write_parquet(frames, fileobj):
+    writer = None
+    schema = None
+    for frame in frames:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            schema = table.schema
+            writer = pq.ParquetWriter(fileobj, schema, compression="zstd")
+        writer.write_table(table.cast(schema))
+    if writer is not None:
+        writer.close()
+
+def write_export(data, fileobj, fmt="CSV", chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream ``data`` to a binary file object one chunk at a time."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    frames = iter_frames(data, chunk_rows)
+    if fmt == "Parquet":
+        _write_parquet(frames, fileobj)
+    elif fmt == "CSV (gzip)":
+        with gzip.GzipFile(fileobj=fileobj, mode="wb") as gz:
+            _write_csv(frames, gz)
+    elif fmt == "CSV (zstd)":
+        with zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False) as zst:
+            _write_csv(frames, zst)
+    else:
+        _write_csv(frames, fileobj)
+    return fileobj
+
+def export_bytes(data, fmt="CSV", chunk_rows=DEFAULT_CHUNK_ROWS):
+    return write_export(data, io.BytesIO(), fmt, chunk_rows).getvalue()
+
+def lazy_export(data, fmt="CSV", chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Zero-argument callable that only serializes ``data`` when invoked.
+
+    ``st.download_button`` runs it on click, so reruns that never download
+    pay nothing.
+    """
+    return lambda: export_bytes(data, fmt, chunk_rows)
+
+def export_file_name(base_name, fmt):
+    return f"{base_name}.{EXPORT_FORMATS[fmt][0]}"
+
+# ----------------------
+# Batch Partitioned Output
+# ----------------------
+
+def _partition_value(value):
+    if isinstance(value, pd.Timestamp):
+        value = value.date()
+    return str(value).replace(os.sep, "_")
+
+def write_partitioned(data, root, by=("pitcher", "game_date"), fmt="Parquet", chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write ``root/<col>=<value>/.../part-NNNNN.<ext>`` per partition.
+
+    ``data`` may be a DataFrame or any iterable of chunks (e.g. the output of
+    ``otv_plus_chunked.standardize_chunks``); each chunk adds new part files
+    so nothing beyond one chunk is held in memory.
+    """
+    by = list(by)
+    written = []
+    part = 0
+    for frame in iter_frames(data, chunk_rows):
+        for values, group in frame.groupby(by, sort=False, dropna=False):
+            values = values if isinstance(values, tuple) else (values,)
+            folder = os.path.join(root, *[f"{col}={_partition_value(v)}" for col, v in zip(by, values)])
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"part-{part:05d}.{EXPORT_FORMATS[fmt][0]}")
+            with open(path, "wb") as f:
+                write_export(group.drop(columns=by), f, fmt, chunk_rows)
+            written.append(path)
+        part += 1
+    return written
+
+# ----------------------
+# Streamlit Helpers
+# ----------------------
+
+def export_format_picker(key):
+    return st.selectbox("Export format", list(EXPORT_FORMATS), key=key)
+
+def export_download_button(label, data, base_name, fmt, key):
+    """Download button that serializes ``data`` only when clicked."""
+    return st.download_button(
+        label,
+        lazy_export(data, fmt),
+        file_name=export_file_name(base_name, fmt),
+        mime=EXPORT_FORMATS[fmt][1],
+        key=key,
+        on_click="ignore",
+    )
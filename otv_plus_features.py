@@ -0,0 +1,214 @@
+# OTV+ Pitch Feature Store
+# Description: Vectorized derived-physics features (movement, spin efficiency, fastball separation) persisted per pitch
+
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+PITCHER_COL = "pitcher"
+PITCH_KEY = ['game_pk', 'at_bat_number', 'pitch_number']
+# Serializes read-merge-write of store files across sessions in this process;
+# files are swapped in whole, so other processes never see a partial write
+_STORE_LOCK = threading.Lock()
+# Features of the pitch alone, safe to persist and reuse across requests
+PITCH_FEATURES = ['IVB', 'Hmove', 'ivb_in', 'spin_efficiency', 'axis_deviation']
+# Features relative to the fastballs in the request, always derived fresh
+SEPARATION_FEATURES = ['hb_arm', 'velo_diff', 'v_sep', 'hb_sep']
+FEATURE_COLUMNS = PITCH_FEATURES + SEPARATION_FEATURES
+TRAJECTORY_COLUMNS = ['vx0', 'vy0', 'vz0', 'ax', 'ay', 'az', 'release_extension', 'release_spin_rate']
+
+# Fastball a pitcher's other pitches are measured against, in order of preference
+FASTBALL_TYPES = ['4-Seam Fastball', 'Sinker', 'Cutter']
+
+# Nathan's trajectory constants (feet, seconds)
+GRAVITY = 32.174
+DRAG_K = 0.005383
+BALL_RPM_PER_FPS = 78.92
+Y_START = 50.0
+Y_PLATE = 17 / 12
+
+# ----------------------
+# Movement & Spin
+# ----------------------
+
+def movement_features(df):
+    # Sign convention the original scoring rules are written against
+    df['IVB'] = -df['pfx_z'] * 12
+    df['Hmove'] = df['pfx_x'] * 12
+    # Induced vertical break in inches, positive = rise
+    df['ivb_in'] = df['pfx_z'] * 12
+    return df
+
+def spin_efficiency(df):
+    """Transverse (active) spin / total spin from the Statcast trajectory fit.
+
+    Follows Alan Nathan's method: take the Magnus acceleration as the part of
+    the fitted acceleration not explained by gravity and drag, convert it to
+    a lift coefficient and then to transverse spin.
+    """
+    if any(col not in df for col in TRAJECTORY_COLUMNS):
+        return pd.Series(np.nan, index=df.index)
+    vx0, vy0, vz0 = (df[c].to_numpy(dtype=float) for c in ['vx0', 'vy0', 'vz0'])
+    ax, ay, az = (df[c].to_numpy(dtype=float) for c in ['ax', 'ay', 'az'])
+    y_release = 60.5 - df['release_extension'].to_numpy(dtype=float)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_release = (-vy0 - np.sqrt(vy0 ** 2 - 2 * ay * (Y_START - y_release))) / ay
+        vxr, vyr, vzr = vx0 + ax * t_release, vy0 + ay * t_release, vz0 + az * t_release
+        t_flight = (-vyr - np.sqrt(vyr ** 2 - 2 * ay * (y_release - Y_PLATE))) / ay
+        vx, vy, vz = vxr + ax * t_flight / 2, vyr + ay * t_flight / 2, vzr + az * t_flight / 2
+        speed = np.sqrt(vx ** 2 + vy ** 2 + vz ** 2)
+        drag = -(ax * vx + ay * vy + (az + GRAVITY) * vz) / speed
+        mx = ax + drag * vx / speed
+        my = ay + drag * vy / speed
+        mz = az + drag * vz / speed + GRAVITY
+        lift = np.sqrt(mx ** 2 + my ** 2 + mz ** 2) / (DRAG_K * speed ** 2)
+        spin_factor = 0.4 * lift / (1 - 2.32 * lift)
+        transverse = BALL_RPM_PER_FPS * spin_factor * speed
+        efficiency = transverse / df['release_spin_rate'].to_numpy(dtype=float)
+    return pd.Series(np.clip(efficiency, 0, 1), index=df.index)
+
+def axis_deviation(df):
+    """Statcast spin axis minus the axis implied by the movement direction (degrees)."""
+    if 'spin_axis' not in df:
+        return pd.Series(np.nan, index=df.index)
+    inferred = (np.degrees(np.arctan2(df['pfx_z'], df['pfx_x'])) + 90) % 360
+    return (df['spin_axis'] - inferred + 180) % 360 - 180
+
+# ----------------------
+# Fastball Separation
+# ----------------------
+
+def _pitcher_keys(df):
+    return df[PITCHER_COL] if PITCHER_COL in df else pd.Series(0, index=df.index)
+
+def fastball_sums(df):
+    """Per pitcher/fastball type sums and counts; add these across chunks."""
+    fastballs = df[df['pitch_name'].isin(FASTBALL_TYPES)]
+    keys = [_pitcher_keys(fastballs).rename(PITCHER_COL), fastballs['pitch_name']]
+    grouped = fastballs[['release_speed', 'pfx_x', 'pfx_z']].groupby(keys)
+    return grouped.sum(min_count=1).join(grouped.count().add_suffix('_n'))
+
+def fastball_reference(sums):
+    """Each pitcher's primary fastball velocity and movement, from ``fastball_sums``."""
+    sums = sums.groupby(level=[0, 1]).sum(min_count=1)
+    means = pd.DataFrame({
+        'fb_velo': sums['release_speed'] / sums['release_speed_n'],
+        'fb_pfx_x': sums['pfx_x'] / sums['pfx_x_n'],
+        'fb_pfx_z': sums['pfx_z'] / sums['pfx_z_n'],
+    }).reset_index()
+    means['rank'] = means['pitch_name'].map({t: i for i, t in enumerate(FASTBALL_TYPES)})
+    return means.sort_values('rank').drop_duplicates(PITCHER_COL).set_index(PITCHER_COL)[['fb_velo', 'fb_pfx_x', 'fb_pfx_z']]
+
+def fastball_separation(df, reference=None):
+    """Velocity and movement separation from the pitcher's primary fastball."""
+    if reference is None:
+        reference = fastball_reference(fastball_sums(df))
+    ref = reference.reindex(_pitcher_keys(df).to_numpy())
+    # Horizontal break in inches toward the arm side; handedness from p_throws,
+    # else (e.g. a live feed without it) from the direction the fastball runs
+    arm = np.sign(ref['fb_pfx_x'].to_numpy())
+    if 'p_throws' in df:
+        throws = df['p_throws'].to_numpy()
+        arm = np.where(throws == 'L', 1.0, np.where(throws == 'R', -1.0, arm))
+    df['hb_arm'] = df['pfx_x'] * 12 * arm
+    df['velo_diff'] = ref['fb_velo'].to_numpy() - df['release_speed']
+    df['v_sep'] = (ref['fb_pfx_z'].to_numpy() - df['pfx_z']) * 12
+    df['hb_sep'] = (ref['fb_pfx_x'].to_numpy() - df['pfx_x']).abs() * 12
+    return df
+
+# ----------------------
+# Feature Stage
+# ----------------------
+
+def add_pitch_features(df, reference=None, overwrite=False):
+    """Fill in any missing feature columns over the whole frame.
+
+    Pass ``reference`` (from ``fastball_reference``) when ``df`` is only part
+    of a pitcher's data, e.g. one chunk of a league pull.
+    """
+    missing = set(FEATURE_COLUMNS) if overwrite else {c for c in FEATURE_COLUMNS if c not in df}
+    if missing & {'IVB', 'Hmove', 'ivb_in'}:
+        df = movement_features(df)
+    if 'spin_efficiency' in missing:
+        df['spin_efficiency'] = spin_efficiency(df)
+    if 'axis_deviation' in missing:
+        df['axis_deviation'] = axis_deviation(df)
+    if missing & {'hb_arm', 'velo_diff', 'v_sep', 'hb_sep'}:
+        df = fastball_separation(df, reference)
+    return df
+
+class FeatureStore:
+    """Per-pitch features persisted as one Parquet file per pitcher.
+
+    Only ``PITCH_FEATURES`` are stored. Separation features depend on the
+    fastball reference of whichever window was requested, so ``attach``
+    recomputes them every time and the same query always scores the same.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, pitcher):
+        return os.path.join(self.directory, f"pitcher={pitcher}.parquet")
+
+    def _read(self, pitcher):
+        path = self._path(pitcher)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except (OSError, ValueError):
+            # An unreadable file counts as missing; the next save rebuilds it
+            return None
+
+    def load(self, pitchers):
+        columns = [PITCHER_COL] + PITCH_KEY + PITCH_FEATURES
+        frames = []
+        for p in pitchers:
+            frame = self._read(p)
+            if frame is not None:
+                # Files written before separation was dropped from the store may still carry it
+                frames.append(frame[[c for c in columns if c in frame]])
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def save(self, df):
+        columns = [PITCHER_COL] + PITCH_KEY + PITCH_FEATURES
+        os.makedirs(self.directory, exist_ok=True)
+        with _STORE_LOCK:
+            for pitcher, group in df[columns].groupby(PITCHER_COL):
+                stored = self.load([pitcher])
+                merged = pd.concat([stored, group], ignore_index=True) if len(stored) else group
+                merged = merged.drop_duplicates(PITCH_KEY, keep="last")
+                fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                os.close(fd)
+                try:
+                    merged.to_parquet(tmp, index=False)
+                    os.replace(tmp, self._path(pitcher))
+                except BaseException:
+                    os.remove(tmp)
+                    raise
+
+    def attach(self, df, reference=None):
+        """Join stored per-pitch features onto ``df``, deriving and saving any that are missing.
+
+        Separation features are derived against ``reference``, or the
+        fastballs in ``df`` itself when it is None.
+        """
+        if any(col not in df for col in [PITCHER_COL] + PITCH_KEY):
+            return add_pitch_features(df, reference)
+        stored = self.load(df[PITCHER_COL].dropna().unique())
+        base = df.drop(columns=[c for c in FEATURE_COLUMNS if c in df])
+        joined = base.merge(stored, on=[PITCHER_COL] + PITCH_KEY, how="left", indicator=True)
+        complete = set(PITCH_FEATURES) <= set(stored.columns)
+        if complete and (joined.pop("_merge") == "both").all():
+            joined.index = df.index
+            return fastball_separation(joined, reference)
+        df = add_pitch_features(base, reference, overwrite=True)
+        self.save(df)
+        return df
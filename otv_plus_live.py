@@ -0,0 +1,255 @@
+# OTV+ Live Game Scoring
+# Description: Poll a game pitch feed and update per-pitch-type Stuff+ incrementally as pitches arrive
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+import streamlit as st
+
+from otv_plus_chunked import PITCHER_COL, ChunkedScorer
+from otv_plus_dashboard_complete import load_reclassifier, score_pitches
+from otv_plus_features import add_pitch_features, fastball_reference, fastball_sums
+
+LIVE_FEED_URL = "https://statsapi.mlb.com/api/v1.1/game/{game_pk}/feed/live"
+# A pitch is only scored (and marked seen) once the feed has filled these in
+REQUIRED_FIELDS = ['release_speed', 'release_spin_rate', 'pfx_x', 'pfx_z']
+FEED_COLUMNS = ['play_id', 'pitcher', 'pitcher_name', 'p_throws', 'inning', 'pitch_name', 'release_speed', 'release_spin_rate', 'pfx_x', 'pfx_z',
+                'vx0', 'vy0', 'vz0', 'ax', 'ay', 'az', 'release_extension']
+# Stats API trajectory fit fields, same units (ft, ft/s, ft/s^2) as Statcast's TRAJECTORY_COLUMNS
+FEED_TRAJECTORY = {'vx0': 'vX0', 'vy0': 'vY0', 'vz0': 'vZ0', 'ax': 'aX', 'ay': 'aY', 'az': 'aZ'}
+
+# MLB Stats API pitch descriptions that differ from Statcast's pitch_name;
+# every scorable type must arrive under its SCORABLE_TYPES spelling
+FEED_PITCH_NAMES = {
+    'Four-Seam Fastball': '4-Seam Fastball',
+    'Two-Seam Fastball': 'Sinker',
+    'Splitter': 'Split-Finger',
+    'Knuckle Ball': 'Knuckleball',
+}
+
+# ----------------------
+# Pitch Feeds
+# ----------------------
+
+def parse_feed(feed):
+    """Flatten a Stats API live feed into one row per pitch (Statcast units)."""
+    rows = []
+    for play in feed.get('liveData', {}).get('plays', {}).get('allPlays', []):
+        matchup = play.get('matchup', {})
+        pitcher = matchup.get('pitcher', {})
+        inning = play.get('about', {}).get('inning')
+        for event in play.get('playEvents', []):
+            if not event.get('isPitch'):
+                continue
+            data = event.get('pitchData', {})
+            coords = data.get('coordinates', {})
+            name = event.get('details', {}).get('type', {}).get('description')
+            rows.append({
+                'play_id': event.get('playId') or f"{play.get('atBatIndex')}-{event.get('index')}",
+                'pitcher': pitcher.get('id'),
+                'pitcher_name': pitcher.get('fullName'),
+                'p_throws': matchup.get('pitchHand', {}).get('code'),
+                'inning': inning,
+                'pitch_name': FEED_PITCH_NAMES.get(name, name),
+                'release_speed': data.get('startSpeed'),
+                'release_spin_rate': data.get('breaks', {}).get('spinRate'),
+                # Stats API reports pfx in inches; Statcast uses feet
+                'pfx_x': coords['pfxX'] / 12 if coords.get('pfxX') is not None else None,
+                'pfx_z': coords['pfxZ'] / 12 if coords.get('pfxZ') is not None else None,
+                # Trajectory fit for spin efficiency; left empty (NaN efficiency) when not sent
+                **{col: coords.get(field) for col, field in FEED_TRAJECTORY.items()},
+                'release_extension': data.get('extension'),
+            })
+    return pd.DataFrame(rows, columns=FEED_COLUMNS)
+
+def feed_is_final(feed):
+    return feed.get('gameData', {}).get('status', {}).get('abstractGameState') == 'Final'
+
+class StatsApiFeed:
+    """Polls the MLB Stats API live feed for one game."""
+
+    def __init__(self, game_pk, timeout=5):
+        self.url = LIVE_FEED_URL.format(game_pk=game_pk)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.final = False
+        self.feed = {}
+        self.error = None
+
+    def poll(self):
+        """Latest feed; on a failed request or bad JSON, the last good one and ``error`` set."""
+        try:
+            resp = self.session.get(self.url, timeout=self.timeout)
+            resp.raise_for_status()
+            feed = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            self.error = f"Feed unavailable, showing the last update ({e.__class__.__name__})"
+            return self.feed
+        self.error = None
+        self.feed = feed
+        self.final = feed_is_final(feed)
+        return feed
+
+class RecordedFeed:
+    """Replays recorded feed snapshots (JSON lines) one per poll, for offline use."""
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.snapshots = [json.loads(line) for line in f if line.strip()]
+        self.position = 0
+        self.final = False
+        self.error = None
+
+    def poll(self):
+        feed = self.snapshots[min(self.position, len(self.snapshots) - 1)]
+        self.position += 1
+        self.final = self.position >= len(self.snapshots) or feed_is_final(feed)
+        return feed
+
+def record_feed(game_pk, path, interval=10, max_polls=None):
+    """Append live feed snapshots to ``path`` until the game is final."""
+    feed = StatsApiFeed(game_pk)
+    polls = 0
+    with open(path, "a") as f:
+        while not feed.final and (max_polls is None or polls < max_polls):
+            snapshot = feed.poll()
+            # Failed polls return the last good snapshot; don't record it twice
+            if feed.error is None:
+                f.write(json.dumps(snapshot) + "\n")
+                f.flush()
+            polls += 1
+            if not feed.final:
+                time.sleep(interval)
+    return path
+
+# ----------------------
+# Incremental Scoring
+# ----------------------
+
+class LiveGameScorer:
+    """Scores only pitches not seen before and keeps running aggregates."""
+
+    def __init__(self, ba_grades):
+        self.ba_grades = ba_grades
+        self.aggregates = ChunkedScorer(ba_grades)
+        self.seen = set()
+        self.pitches = pd.DataFrame()
+        self.latest_pitcher = None
+        self.last_update_ms = 0.0
+
+    def _moved(self, reference):
+        """Pitchers whose fastball reference differs from the one they were scored with."""
+        old = self.aggregates.reference
+        if old is None:
+            return set(reference.index)
+        old = old.reindex(reference.index)
+        same = np.isclose(reference.to_numpy(), old.to_numpy(), equal_nan=True).all(axis=1)
+        return set(reference.index[~same])
+
+    def ingest(self, pitches):
+        start = time.perf_counter()
+        new = pitches[~pitches['play_id'].isin(self.seen)].dropna(subset=[PITCHER_COL] + REQUIRED_FIELDS)
+        if not new.empty:
+            # Pitchers with a fitted pitch-type model get cluster labels; no refit mid-game
+            new = load_reclassifier().reclassify(new, fit=False)
+            # Separation is measured against every fastball seen so far this game;
+            # pitchers whose reference moved are re-derived in full so earlier
+            # pitches (e.g. changeups before the first fastball) stay consistent
+            reference = fastball_reference(fastball_sums(pd.concat([self.pitches, new], ignore_index=True)))
+            moved = self._moved(reference)
+            rescore = self.pitches[PITCHER_COL].isin(moved) if len(self.pitches) else np.zeros(0, dtype=bool)
+            batch = pd.concat([self.pitches[rescore], new], ignore_index=True)
+            scored = score_pitches(add_pitch_features(batch, reference, overwrite=True), self.ba_grades)
+            self.aggregates.reference = reference
+            self.aggregates.drop(moved).update_scored(scored)
+            self.pitches = pd.concat([self.pitches[~rescore], scored], ignore_index=True)
+            self.seen.update(new['play_id'])
+            self.latest_pitcher = new[PITCHER_COL].iloc[-1]
+        self.last_update_ms = 1000 * (time.perf_counter() - start)
+        return len(new)
+
+    def poll(self, feed):
+        return self.ingest(parse_feed(feed.poll()))
+
+    def pitch_type_summary(self, pitcher):
+        """Usage, graded score and usage-weighted score by pitch type."""
+        if self.aggregates.types is None or pitcher not in self.aggregates.rows.index:
+            return pd.DataFrame(columns=['Pitches', 'Usage', 'AvgScore', 'WeightedScore'])
+        types = self.aggregates.types.xs(pitcher, level=PITCHER_COL)
+        usage = self.aggregates.usage_weights().xs(pitcher, level=PITCHER_COL)
+        return pd.DataFrame({
+            'Pitches': types['usage'].astype(int),
+            'Usage': usage.round(3),
+            'AvgScore': types['mean'].round(2),
+            'WeightedScore': (types['mean'] * usage).round(2),
+        }).sort_values('Pitches', ascending=False)
+
+    def graded_score(self, pitcher):
+        """Mean graded score per pitch so far; unlike Stuff+ it does not grow with pitch count."""
+        if self.aggregates.types is None:
+            return np.nan
+        stats = self.aggregates.pitcher_stats()
+        return stats['GradedScore'].get(pitcher, np.nan)
+
+    def pitchers(self):
+        if self.pitches.empty:
+            return {}
+        names = self.pitches.drop_duplicates(PITCHER_COL).set_index(PITCHER_COL)['pitcher_name']
+        return names.to_dict()
+
+# ----------------------
+# Streamlit App
+# ----------------------
+
+def run_live_dashboard():
+    st.set_page_config(page_title="OTV+ Live | Orioles Pitching Evaluator", layout="wide")
+    st.title("🟠 OTV+ Live: In-Game Stuff+")
+    st.markdown("Scores each new pitch from the game feed as it arrives and keeps running Stuff+ by pitch type.")
+
+    ba_grades = {
+        '4-Seam Fastball': 60,
+        'Slider': 55,
+        'Curveball': 55,
+        'Changeup': 50
+    }
+
+    source = st.radio("Feed", ["Live Game", "Recorded Feed"], horizontal=True)
+    if source == "Live Game":
+        game_pk = st.text_input("Game PK")
+    else:
+        recorded_path = st.text_input("Recorded feed (JSON lines)")
+    interval = st.slider("Poll interval (seconds)", 1, 30, 5)
+
+    if st.button("Start"):
+        st.session_state["live_feed"] = StatsApiFeed(game_pk) if source == "Live Game" else RecordedFeed(recorded_path)
+        st.session_state["live_scorer"] = LiveGameScorer(ba_grades)
+    if "live_feed" not in st.session_state:
+        return
+
+    @st.fragment(run_every=interval)
+    def live_panel():
+        feed = st.session_state["live_feed"]
+        scorer = st.session_state["live_scorer"]
+        if not feed.final:
+            scorer.poll(feed)
+        pitchers = scorer.pitchers()
+        st.caption(f"{len(scorer.seen)} pitches scored · last update {scorer.last_update_ms:.0f} ms" + (" · Final" if feed.final else ""))
+        if feed.error:
+            st.warning(feed.error)
+        if not pitchers:
+            st.info("Waiting for pitches...")
+            return
+        # Default to whoever threw the latest pitch
+        options = list(pitchers)
+        pitcher = st.selectbox("Pitcher", options, index=options.index(scorer.latest_pitcher), format_func=lambda p: pitchers[p], key="live_pitcher")
+        grade = scorer.graded_score(pitcher)
+        st.metric("Graded score / pitch", "—" if pd.isna(grade) else f"{grade:.2f}")
+        st.dataframe(scorer.pitch_type_summary(pitcher), use_container_width=True)
+
+    live_panel()
+
+if __name__ == "__main__":
+    run_live_dashboard()
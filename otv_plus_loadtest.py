@@ -0,0 +1,295 @@
+# OTV+ Dashboard Load Test
+# Description: Drive many simulated concurrent Streamlit sessions against stubbed pybaseball/roster backends
+
+import argparse
+import json
+import os
+import random
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest import mock
+from zlib import crc32
+
+import numpy as np
+import pandas as pd
+import pybaseball
+import requests
+from streamlit.testing.v1 import AppTest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COMPLETE_APP = os.path.join(HERE, "otv_plus_dashboard_complete.py")
+# The two-player comparison form only exists on the standardized dashboard
+COMPARE_APP = os.path.join(HERE, "orioles_stuff_plus_standardized.py")
+
+PITCH_MIX = ['4-Seam Fastball', 'Slider', 'Curveball', 'Changeup', 'Sinker']
+# Mean (velo mph, pfx_x ft, pfx_z ft, spin rpm) per type for a right-hander
+PITCH_SHAPES = {
+    '4-Seam Fastball': (94.5, -0.6, 1.35, 2300),
+    'Slider': (86.0, 0.35, 0.15, 2450),
+    'Curveball': (79.0, 0.55, -0.8, 2600),
+    'Changeup': (86.0, -1.2, 0.55, 1750),
+    'Sinker': (93.5, -1.3, 0.7, 2150),
+}
+FT_PER_S_PER_MPH = 5280 / 3600
+LEVELS = ["MLB", "AAA", "AA", "A+", "A"]
+
+# ----------------------
+# Stub Backends
+# ----------------------
+
+class StubBackends:
+    """Deterministic stand-ins for pybaseball lookups and the roster page."""
+
+    def __init__(self, latency_ms=200, jitter_ms=50, pitches_per_day=15, roster_size=40, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.pitches_per_day = pitches_per_day
+        self.roster_size = roster_size
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def _wait(self):
+        with self._lock:
+            self.calls += 1
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        delay = self.latency_ms + jitter
+        time.sleep(max(delay, 0) / 1000)
+
+    def playerid_lookup(self, last, first, *args, **kwargs):
+        self._wait()
+        return pd.DataFrame({"name_last": [last], "name_first": [first], "key_mlbam": [crc32(f"{first} {last}".encode()) % 900000 + 100000]})
+
+    def statcast_pitcher(self, start_dt, end_dt, player_id):
+        """Every column the scoring pipeline reads: pitch keys, handedness and the trajectory fit."""
+        self._wait()
+        days = pd.date_range(start_dt, end_dt)
+        n = len(days) * self.pitches_per_day
+        rng = np.random.default_rng(self.seed + int(player_id))
+        names = rng.choice(PITCH_MIX, n, p=[0.45, 0.2, 0.15, 0.15, 0.05])
+        velo, pfx_x, pfx_z, spin = (np.array([PITCH_SHAPES[t] for t in names]) + rng.normal(0, [1.2, 0.12, 0.12, 90], (n, 4))).T
+        throws = rng.choice(["R", "L"], p=[0.7, 0.3])
+        if throws == "L":
+            pfx_x = -pfx_x
+        # Constant-acceleration fit consistent with the movement: pfx = a t^2 / 2 over the flight
+        vy0 = -velo * FT_PER_S_PER_MPH
+        flight = 50 / -vy0
+        return pd.DataFrame({
+            "pitcher": int(player_id),
+            "p_throws": throws,
+            "game_date": np.repeat(days.strftime("%Y-%m-%d"), self.pitches_per_day),
+            "game_pk": np.repeat(np.arange(len(days)) + 700000, self.pitches_per_day),
+            "at_bat_number": np.tile(np.arange(self.pitches_per_day) // 5 + 1, len(days)),
+            "pitch_number": np.tile(np.arange(self.pitches_per_day) % 5 + 1, len(days)),
+            "pitch_name": names,
+            "pfx_x": pfx_x,
+            "pfx_z": pfx_z,
+            "release_speed": velo,
+            "release_spin_rate": spin,
+            "release_extension": rng.normal(6.3, 0.3, n),
+            "vx0": rng.normal(-5 if throws == "L" else 5, 1.5, n),
+            "vy0": vy0,
+            "vz0": rng.normal(-5, 1.5, n),
+            "ax": 2 * pfx_x / flight ** 2,
+            "ay": rng.normal(28, 2, n),
+            "az": 2 * pfx_z / flight ** 2 - 32.174,
+        })
+
+    def roster_html(self):
+        rows = "".join(
+            f"<tr><td>Stub Pitcher{i}</td><td>{20 + i % 10}</td><td>P</td><td>R</td><td>R</td><td>{LEVELS[i % len(LEVELS)]}</td></tr>"
+            for i in range(self.roster_size)
+        )
+        return f"<html><body><table><thead><tr><th>Name</th></tr></thead><tbody>{rows}</tbody></table></body></html>"
+
+    def requests_get(self, url, *args, **kwargs):
+        self._wait()
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = self.roster_html().encode()
+        resp.encoding = "utf-8"
+        return resp
+
+    @contextmanager
+    def installed(self):
+        # Apps bind these names via `from pybaseball import ...` on every rerun
+        with mock.patch.object(pybaseball, "playerid_lookup", self.playerid_lookup), \
+                mock.patch.object(pybaseball, "statcast_pitcher", self.statcast_pitcher), \
+                mock.patch.object(requests, "get", self.requests_get):
+            yield self
+
+# ----------------------
+# Session Scenarios
+# ----------------------
+
+def _player_view(at, timeout):
+    yield "load", lambda: at.run(timeout=timeout)
+    at.text_input[0].input("Kyle")
+    at.text_input[1].input("Bradish")
+    yield "score", lambda: at.button[0].click().run(timeout=timeout)
+
+def _compare_players(at, timeout):
+    yield "load", lambda: at.run(timeout=timeout)
+    at.selectbox[0].set_value("Kyle Bradish")
+    at.selectbox[1].set_value("Grayson Rodriguez")
+    yield "compare", lambda: at.button[0].click().run(timeout=timeout)
+
+def _team_view(at, timeout):
+    yield "load", lambda: at.run(timeout=timeout)
+    yield "switch", lambda: at.radio[0].set_value("Team View").run(timeout=timeout)
+    yield "score", lambda: at.button[0].click().run(timeout=timeout)
+
+SCENARIOS = {
+    "player": (COMPLETE_APP, _player_view),
+    "compare": (COMPARE_APP, _compare_players),
+    "team": (COMPLETE_APP, _team_view),
+}
+
+def run_session(name, timeout):
+    """Run one simulated user session; returns (page, seconds, error) records."""
+    path, steps = SCENARIOS[name]
+    at = AppTest.from_file(path, default_timeout=timeout)
+    records = []
+    for step, action in steps(at, timeout):
+        start = time.perf_counter()
+        try:
+            action()
+            error = at.exception[0].message if at.exception else None
+        except Exception as exc:
+            error = repr(exc)
+        records.append((f"{name}:{step}", time.perf_counter() - start, error))
+        if error:
+            break
+    return records
+
+# ----------------------
+# Measurement
+# ----------------------
+
+def _current_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_mb = _current_rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak_mb = max(self.peak_mb, _current_rss_mb())
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak_mb = max(self.peak_mb, _current_rss_mb())
+
+def summarize(records, elapsed, peak_rss_mb, baseline_rss_mb):
+    frame = pd.DataFrame(records, columns=["page", "seconds", "error"])
+    ok = frame[frame["error"].isna()]
+
+    def latency(group):
+        return pd.Series({
+            "requests": len(group),
+            "p50_ms": 1000 * group.quantile(0.50),
+            "p95_ms": 1000 * group.quantile(0.95),
+            "p99_ms": 1000 * group.quantile(0.99),
+            "max_ms": 1000 * group.max(),
+        })
+
+    pages = ok.groupby("page")["seconds"].apply(latency).unstack() if len(ok) else pd.DataFrame()
+    overall = latency(ok["seconds"]) if len(ok) else pd.Series(dtype=float)
+    return {
+        "pages": pages.round(1).to_dict(orient="index"),
+        "overall": overall.round(1).to_dict(),
+        "errors": int(frame["error"].notna().sum()),
+        "error_samples": frame["error"].dropna().unique()[:5].tolist(),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_pages_per_s": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "rss_growth_mb": round(peak_rss_mb - baseline_rss_mb, 1),
+    }
+
+def run_load_test(sessions=50, concurrency=10, mix=None, backends=None, timeout=60, seed=0):
+    """Run ``sessions`` simulated users, ``concurrency`` at a time.
+
+    ``mix`` maps scenario name to relative weight; defaults to an even mix.
+    """
+    mix = mix or {name: 1 for name in SCENARIOS}
+    backends = backends or StubBackends(seed=seed)
+    rng = random.Random(seed)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=sessions)
+
+    baseline = _current_rss_mb()
+    sampler = RssSampler()
+    records = []
+    with backends.installed():
+        sampler.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for session in pool.map(lambda name: run_session(name, timeout), plan):
+                records.extend(session)
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+    report = summarize(records, elapsed, sampler.peak_mb, baseline)
+    report.update(sessions=sessions, concurrency=concurrency, backend_calls=backends.calls)
+    return report
+
+def print_report(report):
+    print(f"Sessions: {report['sessions']}  Concurrency: {report['concurrency']}  Elapsed: {report['elapsed_s']}s")
+    print(f"Throughput: {report['throughput_pages_per_s']} pages/s  Backend calls: {report['backend_calls']}")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB (+{report['rss_growth_mb']} MB)  Errors: {report['errors']}")
+    for sample in report["error_samples"]:
+        print(f"  error: {sample}")
+    if report["pages"]:
+        print(pd.DataFrame(report["pages"]).T.to_string())
+    if report["overall"]:
+        o = report["overall"]
+        print(f"Overall p50/p95/p99: {o['p50_ms']}/{o['p95_ms']}/{o['p99_ms']} ms")
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the OTV+ dashboards with simulated sessions.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mix", type=_parse_mix, default=None, help="e.g. team=1,player=2,compare=1")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--pitches-per-day", type=int, default=15)
+    parser.add_argument("--roster-size", type=int, default=40)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report to this path")
+    args = parser.parse_args(argv)
+
+    backends = StubBackends(args.latency_ms, args.jitter_ms, args.pitches_per_day, args.roster_size, args.seed)
+    report = run_load_test(args.sessions, args.concurrency, args.mix, backends, args.timeout, args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=float)
+    return report
+
+if __name__ == "__main__":
+    main()
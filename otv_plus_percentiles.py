@@ -0,0 +1,121 @@
+# OTV+ League Percentile Index
+# Description: Persisted per-pitch-type reference distributions for batch league percentile lookups
+
+import numpy as np
+import pandas as pd
+
+# Per-pitcher table of graded score per pitch; the name changed when it stopped
+# holding Stuff+, so indexes built before then have no pitcher table
+PITCHER_KEY = "__pitcher_graded__"
+DEFAULT_MAX_SIZE = 2048
+
+# ----------------------
+# Weighted Quantile Sketch
+# ----------------------
+
+def _compress(values, weights, max_size):
+    # Collapse into max_size equal-weight centroids; order is preserved
+    if len(values) <= max_size:
+        return values, weights
+    cum = np.cumsum(weights)
+    bins = np.minimum((cum - weights / 2) / cum[-1] * max_size, max_size - 1).astype(int)
+    weight = np.bincount(bins, weights=weights, minlength=max_size)
+    total = np.bincount(bins, weights=values * weights, minlength=max_size)
+    keep = weight > 0
+    return total[keep] / weight[keep], weight[keep]
+
+class PercentileIndex:
+    """Sorted reference values per key (pitch type, or ``PITCHER_KEY``).
+
+    Keys stay exact up to ``max_size`` values and become a weighted quantile
+    sketch beyond that, so indexes from new data can be merged in at any time.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.tables = {}
+
+    def __contains__(self, key):
+        return key in self.tables
+
+    def keys(self):
+        return list(self.tables)
+
+    def _insert(self, key, values, weights):
+        if key in self.tables:
+            old_values, old_weights = self.tables[key]
+            values = np.concatenate([old_values, values])
+            weights = np.concatenate([old_weights, weights])
+        order = np.argsort(values, kind="mergesort")
+        self.tables[key] = _compress(values[order], weights[order], self.max_size)
+
+    def update(self, values, keys):
+        """Add raw observations; ``keys`` is a scalar or one key per value."""
+        values = np.asarray(values, dtype=float)
+        keys = np.broadcast_to(np.asarray(keys, dtype=object), values.shape)
+        valid = ~np.isnan(values)
+        for key, group in pd.Series(values[valid]).groupby(keys[valid]):
+            self._insert(key, group.to_numpy(), np.ones(len(group)))
+        return self
+
+    def merge(self, other):
+        for key, (values, weights) in other.tables.items():
+            self._insert(key, values, weights)
+        return self
+
+    def percentiles(self, values, keys):
+        """Mid-rank league percentile (0-100) for each value; NaN if unknown."""
+        values = np.asarray(values, dtype=float)
+        keys = np.broadcast_to(np.asarray(keys, dtype=object), values.shape)
+        out = np.full(values.shape, np.nan)
+        for key, positions in pd.Series(keys).groupby(keys).indices.items():
+            if key not in self.tables:
+                continue
+            ref, weights = self.tables[key]
+            cum = np.concatenate([[0.0], np.cumsum(weights)])
+            x = values[positions]
+            below = cum[np.searchsorted(ref, x, side="left")]
+            at_or_below = cum[np.searchsorted(ref, x, side="right")]
+            pct = 100 * (below + at_or_below) / (2 * cum[-1])
+            out[positions] = np.where(np.isnan(x), np.nan, pct)
+        return out
+
+    # ----------------------
+    # Persistence
+    # ----------------------
+
+    def save(self, path):
+        arrays = {"keys": np.array(list(self.tables), dtype=str), "max_size": np.array(self.max_size)}
+        for i, (values, weights) in enumerate(self.tables.values()):
+            arrays[f"values_{i}"] = values
+            arrays[f"weights_{i}"] = weights
+        np.savez_compressed(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(max_size=int(data["max_size"]))
+            for i, key in enumerate(data["keys"]):
+                index.tables[str(key)] = (data[f"values_{i}"], data[f"weights_{i}"])
+        return index
+
+# ----------------------
+# DataFrame Helpers
+# ----------------------
+
+def build_pitch_index(df, value_col="Score", index=None):
+    index = index or PercentileIndex()
+    return index.update(df[value_col], df["pitch_name"].astype(str))
+
+def build_pitcher_index(team_df, value_col="GradedScore", index=None):
+    index = index or PercentileIndex()
+    return index.update(team_df[value_col], PITCHER_KEY)
+
+def add_pitch_percentiles(df, index, value_col="Score", out_col="LeaguePct"):
+    df[out_col] = index.percentiles(df[value_col], df["pitch_name"].astype(str))
+    return df
+
+def add_pitcher_percentiles(team_df, index, value_col="GradedScore", out_col="LeaguePct"):
+    team_df[out_col] = index.percentiles(team_df[value_col], PITCHER_KEY)
+    return team_df
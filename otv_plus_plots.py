@@ -0,0 +1,203 @@
+# OTV+ Fast Plotting
+# Description: Binned score summaries and cached figures so dashboard reruns skip per-pitch KDEs
+
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+
+DEFAULT_BINS = 20
+CACHE_SIZE = 64
+
+# Shared by every dashboard session, so all access goes through _CACHE_LOCK;
+# figures are built as bare Figure objects since pyplot state is not thread-safe
+_SUMMARY_CACHE = OrderedDict()
+_FIGURE_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+# ----------------------
+# Binned Summaries
+# ----------------------
+
+def data_key(df, columns):
+    hashed = pd.util.hash_pandas_object(df[columns], index=False).values
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+def _lookup(cache, key):
+    with _CACHE_LOCK:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    return None
+
+def _remember(cache, key, value):
+    with _CACHE_LOCK:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+    return value
+
+def _box_stats(values):
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        "q1": q1, "med": med, "q3": q3, "mean": values.mean(),
+        "whislo": inside.min(), "whishi": inside.max(), "fliers": [],
+    }
+
+def score_summary(df, value_col, group_col=None, bins=DEFAULT_BINS):
+    """Histogram counts and box-plot quantiles, computed once per dataset."""
+    columns = [value_col] + ([group_col] if group_col else [])
+    key = (data_key(df, columns), value_col, group_col, bins)
+    cached = _lookup(_SUMMARY_CACHE, key)
+    if cached is not None:
+        return cached
+
+    data = df[columns].dropna(subset=[value_col])
+    values = data[value_col].to_numpy(dtype=float)
+    if group_col:
+        codes, names = pd.factorize(data[group_col].astype(str), sort=True)
+    else:
+        codes, names = np.zeros(len(values), dtype=int), np.array(["All"])
+    if len(values):
+        edges = np.histogram_bin_edges(values, bins=bins)
+    else:
+        edges = np.linspace(0, 1, bins + 1)
+    slot = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, bins - 1)
+    counts = np.bincount(codes * bins + slot, minlength=len(names) * bins).reshape(len(names), bins)
+
+    groups = {}
+    for i, name in enumerate(names):
+        group_values = values[codes == i]
+        if len(group_values):
+            groups[name] = {"counts": counts[i], "stats": _box_stats(group_values), "n": len(group_values)}
+    summary = {"key": key[0], "value_col": value_col, "edges": edges, "groups": groups}
+    return _remember(_SUMMARY_CACHE, key, summary)
+
+# ----------------------
+# Static Figures
+# ----------------------
+
+def hist_figure(summary, title, xlabel, ylabel, color="orange"):
+    edges = summary["edges"]
+    centers = (edges[:-1] + edges[1:]) / 2
+    counts = sum(g["counts"] for g in summary["groups"].values())
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar(centers, counts, width=np.diff(edges), color=color, alpha=0.6, edgecolor="white")
+    if counts.sum():
+        # Light smoothing of the binned counts stands in for the per-pitch KDE
+        kernel = np.array([1, 2, 3, 2, 1]) / 9
+        ax.plot(centers, np.convolve(counts, kernel, mode="same"), color=color)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    return fig
+
+def box_figure(summary, title, xlabel, ylabel, figsize=(8, 4)):
+    names = list(summary["groups"])
+    stats = [dict(summary["groups"][n]["stats"], label=n) for n in names]
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    if stats:
+        parts = ax.bxp(stats, showfliers=False, patch_artist=True)
+        colors = colormaps["Oranges"](np.linspace(0.3, 0.8, len(stats)))
+        for patch, color in zip(parts["boxes"], colors):
+            patch.set_facecolor(color)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return fig
+
+def violin_figure(summary, title, xlabel, ylabel):
+    edges = summary["edges"]
+    centers = (edges[:-1] + edges[1:]) / 2
+    names = list(summary["groups"])
+    vpstats = []
+    for name in names:
+        group = summary["groups"][name]
+        stats = group["stats"]
+        vpstats.append({
+            "coords": centers,
+            "vals": group["counts"] / group["n"],
+            "mean": stats["mean"], "median": stats["med"],
+            "min": stats["whislo"], "max": stats["whishi"],
+        })
+    fig = Figure()
+    ax = fig.subplots()
+    if vpstats:
+        ax.violin(vpstats, positions=range(len(names)), showmedians=True)
+        ax.set_xticks(range(len(names)))
+        ax.set_xticklabels(names)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return fig
+
+def cached_png(summary, kind, build, *args, **kwargs):
+    """Render ``build(summary, ...)`` to PNG bytes once per dataset and layout."""
+    key = (summary["key"], summary["value_col"], kind, args, tuple(sorted(kwargs.items())))
+    cached = _lookup(_FIGURE_CACHE, key)
+    if cached is not None:
+        return cached
+    fig = build(summary, *args, **kwargs)
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return _remember(_FIGURE_CACHE, key, buf.getvalue())
+
+# ----------------------
+# Interactive Charts
+# ----------------------
+
+def hist_frame(summary):
+    edges = summary["edges"]
+    centers = np.round((edges[:-1] + edges[1:]) / 2, 1)
+    return pd.DataFrame({name: g["counts"] for name, g in summary["groups"].items()}, index=centers)
+
+def box_frame(summary):
+    rows = [dict(group=name, **g["stats"]) for name, g in summary["groups"].items()]
+    return pd.DataFrame(rows).drop(columns="fliers") if rows else pd.DataFrame()
+
+def box_spec(ylabel):
+    y = {"field": "q1", "type": "quantitative", "title": ylabel}
+    return {
+        "layer": [
+            {"mark": "rule", "encoding": {"y": dict(y, field="whislo"), "y2": {"field": "whishi"}}},
+            {"mark": {"type": "bar", "size": 20, "color": "orange"}, "encoding": {"y": y, "y2": {"field": "q3"}}},
+            {"mark": {"type": "tick", "color": "black", "size": 20}, "encoding": {"y": dict(y, field="med")}},
+        ],
+        "encoding": {"x": {"field": "group", "type": "nominal", "title": None}},
+    }
+
+# ----------------------
+# Streamlit Helpers
+# ----------------------
+
+def show_histogram(df, value_col, title, xlabel, ylabel, interactive=False, bins=DEFAULT_BINS):
+    summary = score_summary(df, value_col, bins=bins)
+    if interactive:
+        st.bar_chart(hist_frame(summary))
+    else:
+        st.image(cached_png(summary, "hist", hist_figure, title, xlabel, ylabel))
+
+def show_boxplot(df, value_col, group_col, title, xlabel, ylabel, interactive=False):
+    summary = score_summary(df, value_col, group_col)
+    if interactive:
+        st.vega_lite_chart(box_frame(summary), box_spec(ylabel), use_container_width=True)
+    else:
+        st.image(cached_png(summary, "box", box_figure, title, xlabel, ylabel))
+
+def show_pitch_score_dist(df, value_col, title, ylabel="Stuff+ Score", interactive=False, bins=DEFAULT_BINS):
+    summary = score_summary(df, value_col, "pitch_name", bins=bins)
+    if interactive:
+        st.vega_lite_chart(box_frame(summary), box_spec(ylabel), use_container_width=True)
+    else:
+        st.image(cached_png(summary, "violin", violin_figure, title, "Pitch Type", ylabel))
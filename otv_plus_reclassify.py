@@ -0,0 +1,293 @@
+# OTV+ Pitch Reclassification
+# Description: Batched per-pitcher k-means on velocity, movement and spin to relabel pitch types before scoring
+
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+PITCHER_COL = "pitcher"
+CLUSTER_FEATURES = ['release_speed', 'pfx_x', 'pfx_z', 'release_spin_rate']
+# Rough within-pitch-type spreads (mph, ft, ft, rpm) so no feature dominates distances
+FEATURE_SCALES = np.array([2.5, 0.25, 0.25, 200.0])
+
+# Types the scoring dispatch has a rule for, using Statcast's pitch_name spelling
+SCORABLE_TYPES = [
+    '4-Seam Fastball', 'Sinker', 'Cutter', 'Slider', 'Sweeper', 'Curveball', 'Knuckle Curve', 'Changeup', 'Split-Finger',
+]
+# A Statcast label needs this many pitches to seed its own cluster
+MIN_PITCHES = 5
+# Refit a cached model once any Statcast label's share moves this far from
+# what it was fitted on, or a label with MIN_PITCHES pitches is new to it
+SHARE_TOLERANCE = 0.05
+MAX_CLUSTERS = 8
+MAX_ITER = 25
+# Upper bound on pitchers x pitches x clusters per batched k-means step
+MAX_BATCH_CELLS = 20_000_000
+
+# ----------------------
+# Cluster Labelling
+# ----------------------
+
+def classify_centroid(velo_diff, ivb, hb_arm, spin):
+    """Pitch type from a cluster's shape relative to the pitcher's hardest cluster.
+
+    ``ivb`` is induced vertical break and ``hb_arm`` arm-side break, both in inches.
+    """
+    if velo_diff <= 2.5:
+        if ivb >= 13:
+            return '4-Seam Fastball'
+        if hb_arm >= 10:
+            return 'Sinker'
+        if hb_arm <= 3:
+            return 'Cutter'
+        return '4-Seam Fastball'
+    if velo_diff <= 6 and hb_arm <= 3 and ivb > 2:
+        return 'Cutter'
+    if velo_diff >= 5 and hb_arm >= 6:
+        return 'Split-Finger' if spin < 1500 else 'Changeup'
+    if velo_diff >= 6 and abs(hb_arm) < 6 and spin < 1500:
+        return 'Split-Finger'
+    if ivb <= -4:
+        return 'Curveball'
+    if hb_arm <= -12:
+        return 'Sweeper'
+    return 'Slider'
+
+def label_clusters(centroids, counts, votes, arm_sign):
+    """Name each cluster: the majority Statcast label when it is scorable, else by shape.
+
+    Majority voting re-routes mislabeled pitches to their cluster's type;
+    sliders with sweeper-level glove-side break are promoted to sweepers.
+    """
+    valid = counts > 0
+    top = int(np.argmax(np.where(valid, centroids[:, 0], -np.inf)))
+    labels = []
+    for k, (velo, pfx_x, pfx_z, spin) in enumerate(centroids):
+        if not valid[k]:
+            labels.append(None)
+            continue
+        ivb, hb_arm = pfx_z * 12, pfx_x * 12 * arm_sign
+        label = votes[k].idxmax() if len(votes[k]) else None
+        if label not in SCORABLE_TYPES:
+            label = classify_centroid(centroids[top, 0] - velo, ivb, hb_arm, spin)
+        elif label == 'Slider' and hb_arm <= -14:
+            label = 'Sweeper'
+        labels.append(label)
+    return labels
+
+# ----------------------
+# Batched K-Means
+# ----------------------
+
+def _initial_centroids(X, names):
+    """Seed one cluster per Statcast label, falling back to velocity quantiles.
+
+    Rarely thrown pitches still get their own seed so they are not merged
+    into a neighbouring type.
+    """
+    counts = pd.Series(names).value_counts()
+    keep = counts[counts >= MIN_PITCHES].index[:MAX_CLUSTERS]
+    if len(keep):
+        return np.stack([X[names == label].mean(axis=0) for label in keep])
+    k = min(3, len(X))
+    order = np.argsort(X[:, 0])
+    return X[order[np.linspace(0, len(X) - 1, k).astype(int)]]
+
+def batched_kmeans(X, mask, centroids, cmask, max_iter=MAX_ITER):
+    """Lloyd iterations for many pitchers at once.
+
+    ``X`` is (pitchers, pitches, features) with ``mask`` marking real pitches;
+    ``centroids`` is (pitchers, clusters, features) with ``cmask`` marking
+    real clusters. Returns (assignments, centroids).
+    """
+    assign = np.full(mask.shape, -1)
+    for _ in range(max_iter):
+        dist = ((X[:, :, None, :] - centroids[:, None, :, :]) ** 2).sum(axis=3)
+        dist = np.where(cmask[:, None, :], dist, np.inf)
+        new = np.where(mask, dist.argmin(axis=2), -1)
+        if np.array_equal(new, assign):
+            break
+        assign = new
+        onehot = (assign[..., None] == np.arange(centroids.shape[1])) & mask[..., None]
+        counts = onehot.sum(axis=1)
+        sums = np.einsum("pnk,pnd->pkd", onehot, X)
+        # Empty clusters keep their previous centroid
+        centroids = np.where(counts[..., None] > 0, sums / np.maximum(counts, 1)[..., None], centroids)
+    return assign, centroids
+
+def _batches(sizes, widths):
+    # Similar-sized pitchers share a batch to limit padding
+    batch, n_max, k_max = [], 0, 0
+    for i in np.argsort(sizes, kind="mergesort"):
+        n, k = max(n_max, sizes[i]), max(k_max, widths[i])
+        if batch and (len(batch) + 1) * n * k * len(CLUSTER_FEATURES) > MAX_BATCH_CELLS:
+            yield batch
+            batch, n, k = [], sizes[i], widths[i]
+        batch.append(i)
+        n_max, k_max = n, k
+    if batch:
+        yield batch
+
+# ----------------------
+# Reclassifier
+# ----------------------
+
+def _statcast_names(df):
+    # Frames that were already reclassified keep the original label aside
+    return df['statcast_pitch_name'] if 'statcast_pitch_name' in df else df['pitch_name']
+
+def _label_shares(names):
+    return pd.Series(names).value_counts(normalize=True)
+
+class PitchReclassifier:
+    """Fits, caches and applies per-pitcher pitch-type cluster models.
+
+    A model is the scaled centroids, their pitch-type labels and the
+    Statcast label shares it was fitted on. Pitchers with a current model
+    are assigned to the nearest centroid without a refit, which is also
+    what live scoring uses for incoming pitches. One instance may be shared
+    across sessions: fits are serialized and model files swapped in whole.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.models = {}
+        self._lock = threading.Lock()
+
+    def _path(self, pitcher):
+        return os.path.join(self.directory, f"pitcher={pitcher}.npz")
+
+    def get_model(self, pitcher):
+        if pitcher not in self.models and self.directory and os.path.exists(self._path(pitcher)):
+            with np.load(self._path(pitcher), allow_pickle=False) as data:
+                # Models saved without label shares cannot be checked for staleness; refit them
+                if "share_names" not in data:
+                    return None
+                shares = pd.Series(data["share_values"], index=[str(x) for x in data["share_names"]])
+                self.models[pitcher] = (data["centroids"], [str(x) for x in data["labels"]], shares)
+        return self.models.get(pitcher)
+
+    def _store(self, pitcher, centroids, labels, shares):
+        keep = [i for i, label in enumerate(labels) if label is not None]
+        model = (centroids[keep], [labels[i] for i in keep], shares)
+        self.models[pitcher] = model
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(
+                        f,
+                        centroids=model[0],
+                        labels=np.array(model[1], dtype=str),
+                        share_names=np.array(shares.index, dtype=str),
+                        share_values=shares.to_numpy(dtype=float),
+                    )
+                os.replace(tmp, self._path(pitcher))
+            except BaseException:
+                os.remove(tmp)
+                raise
+
+    def fit(self, df):
+        """Fit every pitcher in ``df`` in batched k-means passes and cache the models."""
+        rows = df.dropna(subset=CLUSTER_FEATURES + [PITCHER_COL])
+        groups = rows.groupby(PITCHER_COL).indices
+        pitchers = list(groups)
+        if not pitchers:
+            return self
+        X_all = rows[CLUSTER_FEATURES].to_numpy(dtype=float) / FEATURE_SCALES
+        names_all = _statcast_names(rows).to_numpy(dtype=object)
+        inits = [_initial_centroids(X_all[groups[p]], names_all[groups[p]]) for p in pitchers]
+        sizes = np.array([len(groups[p]) for p in pitchers])
+        widths = np.array([len(c) for c in inits])
+
+        for batch in _batches(sizes, widths):
+            n_max, k_max = sizes[batch].max(), widths[batch].max()
+            X = np.zeros((len(batch), n_max, len(CLUSTER_FEATURES)))
+            mask = np.zeros((len(batch), n_max), dtype=bool)
+            C = np.zeros((len(batch), k_max, len(CLUSTER_FEATURES)))
+            cmask = np.zeros((len(batch), k_max), dtype=bool)
+            for b, i in enumerate(batch):
+                X[b, :sizes[i]] = X_all[groups[pitchers[i]]]
+                mask[b, :sizes[i]] = True
+                C[b, :widths[i]] = inits[i]
+                cmask[b, :widths[i]] = True
+            assign, C = batched_kmeans(X, mask, C, cmask)
+
+            for b, i in enumerate(batch):
+                pitcher = pitchers[i]
+                members = assign[b, :sizes[i]]
+                names = pd.Series(names_all[groups[pitcher]])
+                counts = np.bincount(members, minlength=k_max)
+                votes = [names[members == k].value_counts() for k in range(k_max)]
+                centroids = C[b] * FEATURE_SCALES
+                arm_sign = self._arm_sign(rows.iloc[groups[pitcher]], centroids, counts)
+                labels = label_clusters(centroids, counts, votes, arm_sign)
+                self._store(pitcher, C[b], labels, _label_shares(names))
+        return self
+
+    @staticmethod
+    def _arm_sign(rows, centroids, counts):
+        if 'p_throws' in rows and rows['p_throws'].notna().any():
+            return 1.0 if rows['p_throws'].mode().iloc[0] == 'L' else -1.0
+        top = np.argmax(np.where(counts > 0, centroids[:, 0], -np.inf))
+        return 1.0 if centroids[top, 1] > 0 else -1.0
+
+    @staticmethod
+    def _stale(model, names):
+        fitted = model[2]
+        counts = names.value_counts()
+        new_labels = set(counts[counts >= MIN_PITCHES].index) - set(fitted.index)
+        moved = (counts / counts.sum()).sub(fitted, fill_value=0).abs() > SHARE_TOLERANCE
+        return bool(new_labels) or bool(moved.any())
+
+    def fit_missing(self, df, refit=False):
+        """Fit pitchers without a model, or whose Statcast label mix no longer matches it."""
+        rows = df.dropna(subset=CLUSTER_FEATURES + [PITCHER_COL])
+        names = _statcast_names(rows)
+        with self._lock:
+            todo = []
+            for pitcher, positions in rows.groupby(PITCHER_COL).indices.items():
+                model = None if refit else self.get_model(pitcher)
+                if model is None or self._stale(model, names.iloc[positions]):
+                    todo.append(pitcher)
+            if todo:
+                self.fit(rows[rows[PITCHER_COL].isin(todo)])
+        return self
+
+    def reclassify(self, df, fit=True, refit=False):
+        """Relabel ``pitch_name`` by cluster; the Statcast label moves to ``statcast_pitch_name``.
+
+        With ``fit`` pitchers lacking a current model (all of them with
+        ``refit``) are fitted first in one batched pass. Pitches keep their
+        Statcast label when the pitcher has no model, inputs are missing, or
+        the label is a scorable type with no cluster of its own.
+        """
+        if PITCHER_COL not in df or df.empty:
+            return df
+        if fit:
+            self.fit_missing(df, refit=refit)
+
+        df = df.copy()
+        df['statcast_pitch_name'] = _statcast_names(df)
+        X = df[CLUSTER_FEATURES].to_numpy(dtype=float) / FEATURE_SCALES
+        usable = ~np.isnan(X).any(axis=1)
+        statcast = df['statcast_pitch_name'].to_numpy(dtype=object)
+        labels = statcast.copy()
+        for pitcher, positions in df.groupby(PITCHER_COL).indices.items():
+            model = self.get_model(pitcher)
+            if model is None:
+                continue
+            centroids, names, _ = model
+            positions = positions[usable[positions]]
+            # Majority voting may only move a scorable label onto a type the model has a cluster for
+            original = pd.Series(statcast[positions])
+            unmatched = (original.isin(SCORABLE_TYPES) & ~original.isin(names)).to_numpy()
+            positions = positions[~unmatched]
+            dist = ((X[positions, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+            labels[positions] = np.array(names, dtype=object)[dist.argmin(axis=1)]
+        df['pitch_name'] = labels
+        return df
@@ -0,0 +1,82 @@
+# OTV+ Chunked Scoring Tests
+# Description: Chunked league scoring must match scoring each pitcher in memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import otv_plus_dashboard_complete as dashboard
+from otv_plus_cache import ScoreCache
+from otv_plus_chunked import rate_league_chunked, standardize_chunks
+from otv_plus_features import FeatureStore
+from otv_plus_reclassify import PitchReclassifier
+
+PITCH_KEY = ['pitcher', 'game_pk', 'at_bat_number', 'pitch_number']
+# Mean (velo mph, pfx_x ft, pfx_z ft, spin rpm) per type for a right-hander
+SHAPES = {
+    '4-Seam Fastball': (95.0, -0.6, 1.4, 2350),
+    'Sinker': (94.0, -1.3, 0.7, 2200),
+    'Cutter': (90.0, 0.1, 0.7, 2400),
+    'Slider': (86.0, 0.3, 0.1, 2500),
+    'Curveball': (79.0, 0.5, -1.0, 2700),
+    'Changeup': (86.0, -1.2, 0.5, 1700),
+}
+
+def synthetic_league(pitchers=8, seed=7):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for pitcher in range(600000, 600000 + pitchers):
+        types = rng.choice(list(SHAPES), 4, replace=False)
+        n = int(rng.integers(200, 900))
+        names = rng.choice(types, n)
+        shape = np.array([SHAPES[t] for t in names]) + rng.normal(0, [1.2, 0.12, 0.12, 90], (n, 4))
+        frames.append(pd.DataFrame({
+            'pitcher': pitcher,
+            'p_throws': 'R',
+            'pitch_name': names,
+            'game_pk': np.arange(n) // 100,
+            'at_bat_number': np.arange(n) % 100 // 5,
+            'pitch_number': np.arange(n) % 5,
+            'release_speed': shape[:, 0],
+            'pfx_x': shape[:, 1],
+            'pfx_z': shape[:, 2],
+            'release_spin_rate': shape[:, 3],
+        }))
+    league = pd.concat(frames, ignore_index=True)
+    # A few mislabeled sliders for the reclassifier to move back
+    league.loc[league.index[league['pitch_name'] == 'Slider'][:10], 'pitch_name'] = 'Curveball'
+    # Shuffle so every chunk mixes pitchers and no chunk holds a whole pitcher
+    return league.sample(frac=1, random_state=0).reset_index(drop=True)
+
+@pytest.fixture
+def in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(dashboard, "FEATURE_STORE", FeatureStore(str(tmp_path / "features")))
+    monkeypatch.setattr(dashboard, "load_score_cache", lambda: ScoreCache())
+    reclassifier = PitchReclassifier()
+
+    def score(pitches):
+        scored, _ = dashboard.score_prospect(reclassifier.reclassify(pitches.copy()), {})
+        return scored
+    return score
+
+@pytest.mark.parametrize("as_callable", [False, True])
+def test_chunked_matches_in_memory(tmp_path, in_memory, as_callable):
+    league = synthetic_league()
+    path = tmp_path / "league.csv"
+    league.to_csv(path, index=False)
+    source = (lambda: [league]) if as_callable else str(path)
+
+    stats, scorer = rate_league_chunked(source, {}, chunksize=700)
+    chunked = pd.concat(standardize_chunks(source, scorer, chunksize=700), ignore_index=True)
+    memory = pd.concat([in_memory(group) for _, group in league.groupby('pitcher')], ignore_index=True)
+
+    merged = chunked.merge(memory, on=PITCH_KEY, suffixes=('_chunked', '_memory'))
+    assert len(merged) == len(league)
+    assert (merged['pitch_name_chunked'] == merged['pitch_name_memory']).all()
+    np.testing.assert_allclose(merged['Score_chunked'], merged['Score_memory'])
+    np.testing.assert_allclose(
+        merged['WeightedScore_Standardized_chunked'], merged['WeightedScore_Standardized_memory'], atol=1e-9,
+    )
+
+    graded = memory.groupby('pitcher').apply(dashboard.graded_score)
+    np.testing.assert_allclose(stats.set_index('pitcher')['GradedScore'].sort_index(), graded.sort_index())